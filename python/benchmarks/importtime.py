@@ -0,0 +1,75 @@
+"""
+Import-time report for the scraper entry points.
+
+Runs each entry point's module import under `python -X importtime` in a fresh
+interpreter, prints the total and the slowest imports, and exits non-zero if
+any entry point is over budget. Run it after touching top-level imports:
+
+    python benchmarks/importtime.py --budget-ms 150
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (label, directory containing the script, module name)
+ENTRY_POINTS = [
+    ('google-crawls/main.py', os.path.join(ROOT, 'google-crawls'), 'main'),
+    ('google-localbusiness-leads/leads.py', os.path.join(ROOT, 'google-localbusiness-leads'), 'leads'),
+    ('google-localbusiness-leads/app.py', os.path.join(ROOT, 'google-localbusiness-leads'), 'app'),
+]
+
+
+def measure(directory, module):
+    """Import module in a fresh interpreter and return [(cumulative_us, self_us, name)]."""
+    code = f"import sys; sys.path.insert(0, {directory!r}); import {module}"
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=directory, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'import failed')
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        # Format: "import time:   self [us] |  cumulative | imported package"
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import time of the scraper entry points")
+    parser.add_argument("--budget-ms", type=float, default=150, help="Fail if an entry point takes longer to import (default: 150)")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to show (default: 10)")
+    args = parser.parse_args()
+
+    over_budget = []
+    for label, directory, module in ENTRY_POINTS:
+        try:
+            rows = measure(directory, module)
+        except RuntimeError as e:
+            print(f"{label}: ERROR {e}")
+            over_budget.append(label)
+            continue
+
+        total_ms = next((row[0] for row in rows if row[2].strip() == module), 0) / 1000
+        status = 'OK' if total_ms <= args.budget_ms else 'OVER BUDGET'
+        print(f"\n{label}: {total_ms:.1f} ms ({status})")
+        for cumulative_us, self_us, name in sorted(rows, reverse=True)[:args.top]:
+            print(f"  {cumulative_us / 1000:8.1f} ms cumulative {self_us / 1000:8.1f} ms self  {name.strip()}")
+
+        if total_ms > args.budget_ms:
+            over_budget.append(label)
+
+    if over_budget:
+        print(f"\nOver budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark contact-link extraction on large pages.
+
+Compares the path used by scrape_website and ContactDiscovery (the
+selective extract_anchors tokenizer plus rank_contact_candidates) with the
+old full BeautifulSoup tree (when bs4 is installed), reporting pages/sec and
+peak Python memory per page:
+
+    python benchmarks/parse_bench.py --links 5000 --pages 20
+"""
+import argparse
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapekit.contact import rank_contact_candidates
+
+
+def make_page(links):
+    """Build a synthetic business homepage with `links` navigation links and filler text."""
+    parts = ['<html><head><title>Acme</title><script>var x = "a@b";</script></head><body>']
+    for i in range(links):
+        parts.append(f'<div class="card"><a href="/products/item-{i}"><span>Product {i}</span></a>')
+        parts.append(f'<p>Lorem ipsum dolor sit amet {i}, consectetur adipiscing elit.</p></div>')
+    parts.append('<footer><a href="/contact-us">Contact us</a> info@acme.com (555) 123-4567</footer>')
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+PAGE_URL = 'https://acme.example.com/'
+
+
+def ranked_links(html):
+    return rank_contact_candidates(html, PAGE_URL)
+
+
+def soup_links(html):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    links = soup.find_all('a', string=re.compile(r'contact', re.I))
+    if not links:
+        links = soup.find_all('a', href=re.compile(r'contact', re.I))
+    return [link.get('href') for link in links]
+
+
+def run(name, fn, html, pages):
+    start = time.perf_counter()
+    for _ in range(pages):
+        result = fn(html)
+    elapsed = time.perf_counter() - start
+
+    # Separate pass: tracemalloc slows parsing down too much to time it
+    tracemalloc.start()
+    fn(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:12} {pages / elapsed:8.1f} pages/sec  peak {peak / 1024 / 1024:7.1f} MB  -> {result[:1]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark contact-link extraction")
+    parser.add_argument("--links", type=int, default=5000, help="Links per synthetic page (default: 5000)")
+    parser.add_argument("--pages", type=int, default=10, help="Pages to parse per method (default: 10)")
+    args = parser.parse_args()
+
+    html = make_page(args.links)
+    print(f"Page size: {len(html) / 1024:.0f} KB, {args.links + 1} links")
+
+    run('selective', ranked_links, html, args.pages)
+    try:
+        import bs4  # noqa: F401
+    except ImportError:
+        print("bs4 not installed; skipping full-soup comparison")
+    else:
+        run('full soup', soup_links, html, args.pages)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,35 @@
 import requests
 import argparse
+import os
 import re
+import sys
 from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
 from concurrent.futures import ThreadPoolExecutor
 import time
 import logging
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from scrapekit.httpclient import create_session
+from scrapekit.robots import RobotsStore
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("WebVulnScanner")
 
 class WebVulnerabilityScanner:
-    def __init__(self, target_url, threads=5, timeout=10):
+    def __init__(self, target_url, threads=5, timeout=10, respect_robots=True):
         self.target_url = target_url
         self.threads = threads
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
+        # Test payloads must reach the server once: a 500 from an injection
+        # probe is a finding, not something to retry
+        self.session = create_session(workers=threads, connect_only=True, headers={
             'User-Agent': 'VulnScanner/1.0 (Educational Purposes Only)'
         })
+        # The crawler skips disallowed pages and honours Crawl-delay;
+        # the sensitive file checks always run
+        self.robots = RobotsStore(self.session, user_agent='VulnScanner') if respect_robots else None
         self.visited_urls = set()
         self.forms = []
         self.vulnerabilities = []
@@ -38,6 +48,8 @@ class WebVulnerabilityScanner:
         
         # Crawl the website to find all links and forms
         self.crawl(self.target_url)
+        if self.robots:
+            self.robots.save()
         
         # Run vulnerability checks
         self.check_for_vulnerabilities()
@@ -52,6 +64,13 @@ class WebVulnerabilityScanner:
             return
         
         self.visited_urls.add(url)
+        
+        if self.robots:
+            if not self.robots.can_fetch(url):
+                logger.info(f"Skipping (robots.txt): {url}")
+                return
+            time.sleep(self.robots.crawl_delay(url))
+        
         logger.info(f"Crawling: {url}")
         
         try:
@@ -282,6 +301,8 @@ class WebVulnerabilityScanner:
         
         print(f"Crawled {len(self.visited_urls)} URLs")
         print(f"Analyzed {len(self.forms)} forms")
+        print("\nRequests per host:")
+        print(self.session.stats.report())
         print("="*80)
         print("Note: This is a basic scan and may include false positives.")
         print("Always verify findings manually and only test websites you have permission to scan.")
@@ -293,10 +314,11 @@ def main():
     parser.add_argument("url", help="Target URL to scan (e.g., http://example.com)")
     parser.add_argument("-t", "--threads", type=int, default=5, help="Number of threads for crawling (default: 5)")
     parser.add_argument("--timeout", type=int, default=10, help="Request timeout in seconds (default: 10)")
+    parser.add_argument("--ignore-robots", action="store_true", help="Crawl pages disallowed by robots.txt")
     
     args = parser.parse_args()
     
-    scanner = WebVulnerabilityScanner(args.url, args.threads, args.timeout)
+    scanner = WebVulnerabilityScanner(args.url, args.threads, args.timeout, respect_robots=not args.ignore_robots)
     scanner.run_scan()
 
 
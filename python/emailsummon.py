@@ -11,6 +11,8 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import os
 os.system('chcp 65001')  # Set console to UTF-8
 from dotenv import load_dotenv
+from scrapekit.chrome import new_chrome_driver
+from scrapekit.processed import ProcessedContacts
 
 # Load environment variables from .env file
 load_dotenv()
@@ -26,7 +28,7 @@ logging.basicConfig(
 )
 
 class LinkedInEmailRetriever:
-    def __init__(self, username, password, max_daily_contacts=50):
+    def __init__(self, username, password, max_daily_contacts=50, db_path='processed_contacts.db'):
         self.username = username
         self.password = password
         self.max_daily_contacts = max_daily_contacts
@@ -34,53 +36,33 @@ class LinkedInEmailRetriever:
         self.retrieved_today = 0
         self.start_date = datetime.now().date()
         
-        # Track processed contacts to avoid duplicates
-        self.processed_contacts = set()
+        # Track processed contacts to avoid duplicates; looked up by profile ID, not loaded into memory
+        self.processed_contacts = ProcessedContacts(db_path)
         self.load_processed_contacts()
         
     def load_processed_contacts(self):
-        """Load previously processed contacts from CSV file"""
-        encodings = ['utf-8', 'latin-1', 'cp1252']  # Try these encodings in order
-        
-        for encoding in encodings:
-            try:
-                self.processed_contacts = set()  # Reset the set
-                with open('processed_contacts.csv', 'r', encoding=encoding) as f:
-                    reader = csv.reader(f)
-                    for row in reader:
-                        if row:  # Skip empty rows
-                            self.processed_contacts.add(row[0])  # LinkedIn profile ID
-                logging.info(f"Loaded {len(self.processed_contacts)} previously processed contacts using {encoding} encoding")
-                return  # Successfully loaded, exit the method
-            except FileNotFoundError:
-                logging.info("No previous contacts file found, starting fresh")
-                return  # No file exists, exit the method
-            except UnicodeDecodeError:
-                continue  # Try the next encoding
-    
-        # If we get here, none of the encodings worked
-        logging.warning("Could not decode the existing contacts file with any encoding. Creating a backup and starting fresh.")
-        import shutil
-        try:
-            shutil.copy('processed_contacts.csv', 'processed_contacts_backup.csv')
-        except:
-            pass
-        # Create a new empty file
-        with open('processed_contacts.csv', 'w', encoding='utf-8') as f:
-            pass
+        """Import contacts processed before the SQLite store existed from processed_contacts.csv"""
+        imported = self.processed_contacts.import_csv('processed_contacts.csv')
+        if imported:
+            logging.info(f"Imported {imported} contacts from processed_contacts.csv")
+        logging.info(f"{len(self.processed_contacts)} previously processed contacts")
     
     def save_processed_contact(self, profile_id, name, email):
-        """Save processed contact to CSV file"""
-        with open('processed_contacts.csv', 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([profile_id, name, email, datetime.now().isoformat()])
-        
-        # Also append to results file
+        """Record a processed contact; contacts are committed in batches"""
+        self.write_results(self.processed_contacts.add(profile_id, name, email))
+    
+    def flush_processed_contacts(self):
+        """Commit contacts still waiting for a batch"""
+        self.write_results(self.processed_contacts.flush())
+    
+    def write_results(self, rows):
+        """Append newly committed contacts to the results file"""
+        if not rows:
+            return
         with open('contact_emails.csv', 'a', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
-            writer.writerow([name, email, datetime.now().isoformat()])
-            
-        self.processed_contacts.add(profile_id)
+            for profile_id, name, email, processed_at in rows:
+                writer.writerow([name, email, processed_at])
     
     def login(self):
         """Log in to LinkedIn"""
@@ -90,14 +72,16 @@ class LinkedInEmailRetriever:
         options.add_argument('--disable-gpu')  # Disable GPU acceleration
         options.add_experimental_option('excludeSwitches', ['enable-logging'])  # Disable logging
         
-        # Replace this line
-        # self.driver = webdriver.Chrome()  # Or webdriver.Firefox()
-        
-        # With this line
-        self.driver = webdriver.Chrome(options=options)
+        # Leases a warm browser when SCRAPEKIT_BROWSER_SERVICE is set
+        self.driver = new_chrome_driver(options, manage_driver=False)
         
         self.driver.get("https://www.linkedin.com/login")
         
+        # A leased browser may still hold the session from an earlier run
+        if "/login" not in self.driver.current_url:
+            logging.info("Already logged in to LinkedIn")
+            return True
+        
         try:
             # Enter username
             username_field = WebDriverWait(self.driver, 10).until(
@@ -124,8 +108,12 @@ class LinkedInEmailRetriever:
             logging.error(f"Login failed: {str(e)}")
             return False
     
-    def get_contact_list(self, page=1, limit=50):
-        """Get a list of LinkedIn contacts"""
+    def get_contact_list(self, page=1):
+        """
+        Get the connections listed on a page. Returns [] only when the page
+        loaded without any connections (the end of the list); raises
+        TimeoutException when the page itself did not load.
+        """
         self.driver.get(f"https://www.linkedin.com/mynetwork/invite-connect/connections/?page={page}")
         
         try:
@@ -133,32 +121,35 @@ class LinkedInEmailRetriever:
             WebDriverWait(self.driver, 10).until(
                 EC.presence_of_element_located((By.CLASS_NAME, "mn-connection-card"))
             )
-            
-            # Get all contact cards
-            contact_cards = self.driver.find_elements(By.CLASS_NAME, "mn-connection-card")
-            logging.info(f"Found {len(contact_cards)} contacts on page {page}")
-            
-            contacts = []
-            for card in contact_cards[:limit]:
-                try:
-                    name = card.find_element(By.CLASS_NAME, "mn-connection-card__name").text
-                    profile_link = card.find_element(By.CLASS_NAME, "mn-connection-card__link").get_attribute("href")
-                    profile_id = profile_link.split("/in/")[1].split("/")[0]
-                    
-                    if profile_id not in self.processed_contacts:
-                        contacts.append({
-                            "name": name,
-                            "profile_link": profile_link,
-                            "profile_id": profile_id
-                        })
-                except Exception as e:
-                    logging.warning(f"Could not process a contact card: {str(e)}")
-            
-            return contacts
-            
-        except (TimeoutException, NoSuchElementException) as e:
-            logging.error(f"Failed to get contact list: {str(e)}")
+        except TimeoutException:
+            # No cards: either past the last page, or the page did not load
+            loaded = (self.driver.execute_script("return document.readyState") == "complete"
+                      and self.driver.find_elements(By.ID, "global-nav"))
+            if not loaded:
+                raise
+            logging.info(f"No connections on page {page}")
             return []
+        
+        # Get all contact cards
+        contact_cards = self.driver.find_elements(By.CLASS_NAME, "mn-connection-card")
+        logging.info(f"Found {len(contact_cards)} contacts on page {page}")
+        
+        contacts = {}
+        for card in contact_cards:
+            try:
+                name = card.find_element(By.CLASS_NAME, "mn-connection-card__name").text
+                profile_link = card.find_element(By.CLASS_NAME, "mn-connection-card__link").get_attribute("href")
+                profile_id = profile_link.split("/in/")[1].split("/")[0]
+                
+                contacts[profile_id] = {
+                    "name": name,
+                    "profile_link": profile_link,
+                    "profile_id": profile_id
+                }
+            except Exception as e:
+                logging.warning(f"Could not process a contact card: {str(e)}")
+        
+        return list(contacts.values())
     
    
     def extract_email_from_profile(self, profile_link):
@@ -303,17 +294,31 @@ class LinkedInEmailRetriever:
             
         try:
             contacts_needed = self.max_daily_contacts - self.retrieved_today
-            page = 1
+            # Continue from the page the last run stopped on
+            page = int(self.processed_contacts.get_meta('connections_page', 1))
             processed_count = 0
             
             while processed_count < contacts_needed:
                 # Get contacts from current page
-                contacts = self.get_contact_list(page=page, limit=contacts_needed - processed_count)
+                try:
+                    contacts = self.get_contact_list(page=page)
+                except (TimeoutException, NoSuchElementException) as e:
+                    # Keep the cursor on this page so the next run retries it
+                    logging.error(f"Failed to load connections page {page}: {str(e)}")
+                    break
                 
                 if not contacts:
-                    break  # No more contacts to process
+                    # End of the list; start over next time to pick up new connections
+                    logging.info("End of the connection list, next run starts from page 1")
+                    self.processed_contacts.set_meta('connections_page', 1)
+                    break
+                
+                # Drop contacts handled before in one lookup, before any profile is opened
+                new_ids = self.processed_contacts.unprocessed(contact["profile_id"] for contact in contacts)
+                logging.info(f"{len(contacts) - len(new_ids)} contacts on page {page} were already processed")
+                new_ids = set(new_ids[:contacts_needed - processed_count])
                 
-                for contact in contacts:
+                for contact in [contact for contact in contacts if contact["profile_id"] in new_ids]:
                     # Random delay between processing contacts (3-7 seconds)
                     time.sleep(random.uniform(3, 7))
                     
@@ -335,9 +340,11 @@ class LinkedInEmailRetriever:
                     if self.retrieved_today >= self.max_daily_contacts:
                         break
                         
-                # Go to next page if needed
+                # Go to next page if needed; a page is only left behind once all of it was processed
                 if processed_count < contacts_needed:
                     page += 1
+                    self.flush_processed_contacts()
+                    self.processed_contacts.set_meta('connections_page', page)
                 else:
                     break
                     
@@ -348,6 +355,7 @@ class LinkedInEmailRetriever:
             logging.error(f"Error during contact processing: {str(e)}")
             return False
         finally:
+            self.flush_processed_contacts()
             # Always close the browser when done
             if self.driver:
                 self.driver.quit()
@@ -365,6 +373,7 @@ if __name__ == "__main__":
     
     # Process daily contacts
     retriever.process_daily_contacts()
+    retriever.processed_contacts.close()
     
     # Calculate and log the total time taken
     end_time = time.time()
@@ -1,70 +1,124 @@
 import time
 import random
-import re
 import os
-import pandas as pd
-from urllib.parse import urljoin
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
+import queue
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from scrapekit.chrome import new_chrome_driver
+from scrapekit.contact import ContactDiscovery
+from scrapekit.domains import DomainIndex, dedup_key
+from scrapekit.extract import find_phones, plausible_emails
+from scrapekit.leadstore import LeadStore
+from scrapekit.profiles import DEFAULT_PROFILE_ROOT, ProfileStore
+from scrapekit.records import Lead, LeadBatchWriter, leads_to_rows
+from scrapekit.robots import RobotsStore
+
+CSV_COLUMNS = ['title', 'url', 'email', 'phone', 'address', 'contact_page', 'location', 'search_terms']
+
+# pandas and selenium are imported inside the methods that use them so the
+# prompts come up immediately instead of after several seconds of imports.
 
 class SeleniumLeadScraper:
-    def __init__(self, headless=True):
-        """Initialize the Selenium-based scraper."""
+    def __init__(self, headless=True, index_path='selenium_leads_index.json',
+                 profile_dir=DEFAULT_PROFILE_ROOT, profile_cap_mb=2048):
+        """
+        Initialize the Selenium-based scraper.
+        
+        Browsers keep a persistent profile and disk cache under profile_dir
+        (one per driver) so repeat runs reuse cached assets; pass None for
+        throwaway profiles.
+        """
         print("Setting up Selenium WebDriver...")
+        self.headless = headless
         
-        # Setup Chrome options
-        chrome_options = Options()
-        if headless:
-            chrome_options.add_argument("--headless")  # Run in headless mode (no GUI)
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+        self.profile_store = None
+        if profile_dir:
+            self.profile_store = ProfileStore(profile_dir, max_size_mb=profile_cap_mb)
+            self.profile_store.cleanup()
         
         # Initialize the Chrome driver
         try:
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            self.driver = self._create_driver()
             print("WebDriver set up successfully!")
         except Exception as e:
             print(f"Error setting up WebDriver: {e}")
             raise
         
+        # Each lead source gets its own browser so sources can run concurrently
+        self.source_drivers = {}
+        
+        # Contact page candidates are fetched over plain HTTP, several at a time
+        from scrapekit.httpclient import BROWSER_HEADERS, create_session
+        session = create_session(workers=4, headers=BROWSER_HEADERS)
+        self.robots = RobotsStore(session)
+        self.contact_discovery = ContactDiscovery(session, robots=self.robots)
+        
+        # Domains scraped in this or earlier runs, so each company is fetched once
+        self.domain_index = DomainIndex(index_path)
         self.results = []
         
     def __del__(self):
         """Close the browser when the object is destroyed."""
         try:
+            for driver in getattr(self, 'source_drivers', {}).values():
+                driver.quit()
             if hasattr(self, 'driver'):
                 self.driver.quit()
                 print("WebDriver closed.")
         except:
             pass
     
-    def search_google(self, query, num_pages=3):
-        """Search Google using Selenium."""
+    def _chrome_options(self, worker):
+        """Build Chrome options, giving each worker its own persistent profile."""
+        from selenium.webdriver.chrome.options import Options
+        
+        chrome_options = Options()
+        if self.headless:
+            chrome_options.add_argument("--headless")  # Run in headless mode (no GUI)
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--window-size=1920,1080")
+        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+        if self.profile_store:
+            self.profile_store.apply(chrome_options, 'selenium-leads', worker)
+        return chrome_options
+    
+    def _create_driver(self, worker='main'):
+        """Start a new Chrome instance with the scraper's options."""
+        return new_chrome_driver(self._chrome_options(worker))
+    
+    def _get_source_driver(self, source):
+        """Return the dedicated browser for a lead source, starting it on first use."""
+        if source not in self.source_drivers:
+            print(f"Starting browser for {source} source...")
+            self.source_drivers[source] = self._create_driver(worker=source)
+        return self.source_drivers[source]
+    
+    def search_google(self, query, num_pages=3, driver=None, on_lead=None):
+        """Search Google using Selenium. on_lead, if given, is called with each lead as it is found."""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        
+        driver = driver or self.driver
         leads = []
         
         try:
             print(f"Searching Google for: '{query}'")
             search_url = f"https://www.google.com/search?q={query.replace(' ', '+')}"
-            self.driver.get(search_url)
+            driver.get(search_url)
             
             # Wait for search results to load
-            WebDriverWait(self.driver, 10).until(
+            WebDriverWait(driver, 10).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, "div.g"))
             )
             
             # Accept cookies if the dialog appears
             try:
-                cookie_button = WebDriverWait(self.driver, 3).until(
+                cookie_button = WebDriverWait(driver, 3).until(
                     EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'Accept all')]"))
                 )
                 cookie_button.click()
@@ -77,13 +131,13 @@ class SeleniumLeadScraper:
                 if page > 0:
                     try:
                         # Click on "Next" button to go to the next page
-                        next_button = WebDriverWait(self.driver, 10).until(
+                        next_button = WebDriverWait(driver, 10).until(
                             EC.element_to_be_clickable((By.ID, "pnnext"))
                         )
                         next_button.click()
                         
                         # Wait for the new page to load
-                        WebDriverWait(self.driver, 10).until(
+                        WebDriverWait(driver, 10).until(
                             EC.presence_of_element_located((By.CSS_SELECTOR, "div.g"))
                         )
                     except Exception as e:
@@ -92,7 +146,7 @@ class SeleniumLeadScraper:
                 
                 # Extract search results
                 try:
-                    search_results = self.driver.find_elements(By.CSS_SELECTOR, "div.g")
+                    search_results = driver.find_elements(By.CSS_SELECTOR, "div.g")
                     print(f"Found {len(search_results)} results on page {page+1}")
                     
                     for result in search_results:
@@ -104,10 +158,13 @@ class SeleniumLeadScraper:
                             title = title_element.text if title_element else "No title"
                             
                             if url and not url.startswith("https://www.google.com"):
-                                leads.append({
+                                lead = {
                                     'title': title,
                                     'url': url
-                                })
+                                }
+                                leads.append(lead)
+                                if on_lead:
+                                    on_lead(lead)
                                 print(f"Added lead: {title}")
                         except Exception as e:
                             print(f"Error extracting result details: {e}")
@@ -124,11 +181,18 @@ class SeleniumLeadScraper:
         print(f"Total leads found from Google search: {len(leads)}")
         return leads
     
-    def search_linkedin(self, search_term, location=None):
+    def search_linkedin(self, search_term, location=None, driver=None, on_lead=None):
         """
         Search LinkedIn for companies (simplified version).
         Note: Full LinkedIn scraping would require login credentials.
+        on_lead, if given, is called with each lead as it is found.
         """
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
+        
+        driver = driver or self.driver
         leads = []
         
         try:
@@ -136,16 +200,16 @@ class SeleniumLeadScraper:
             url = f"https://www.linkedin.com/search/results/companies/?keywords={query.replace(' ', '%20')}"
             print(f"Searching LinkedIn: {url}")
             
-            self.driver.get(url)
+            driver.get(url)
             
             # Wait for search results to load
             try:
-                WebDriverWait(self.driver, 10).until(
+                WebDriverWait(driver, 10).until(
                     EC.presence_of_element_located((By.CLASS_NAME, "entity-result__title"))
                 )
                 
                 # Extract company results
-                company_elements = self.driver.find_elements(By.CSS_SELECTOR, ".entity-result__item")
+                company_elements = driver.find_elements(By.CSS_SELECTOR, ".entity-result__item")
                 print(f"Found {len(company_elements)} companies on LinkedIn")
                 
                 for company in company_elements:
@@ -154,10 +218,13 @@ class SeleniumLeadScraper:
                         company_name = title_element.text.strip()
                         company_url = title_element.get_attribute("href")
                         
-                        leads.append({
+                        lead = {
                             'title': company_name,
                             'url': company_url
-                        })
+                        }
+                        leads.append(lead)
+                        if on_lead:
+                            on_lead(lead)
                     except:
                         continue
                         
@@ -169,8 +236,13 @@ class SeleniumLeadScraper:
         
         return leads
     
-    def search_yelp(self, category, location):
-        """Search Yelp for local businesses."""
+    def search_yelp(self, category, location, driver=None, on_lead=None):
+        """Search Yelp for local businesses. on_lead, if given, is called with each lead as it is found."""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        
+        driver = driver or self.driver
         leads = []
         
         try:
@@ -178,15 +250,15 @@ class SeleniumLeadScraper:
             url = f"https://www.yelp.com/search?find_desc={query}"
             print(f"Searching Yelp: {url}")
             
-            self.driver.get(url)
+            driver.get(url)
             
             # Wait for search results to load
-            WebDriverWait(self.driver, 10).until(
+            WebDriverWait(driver, 10).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, ".css-1qn0b6x"))
             )
             
             # Extract business results
-            business_elements = self.driver.find_elements(By.CSS_SELECTOR, ".css-1qn0b6x")
+            business_elements = driver.find_elements(By.CSS_SELECTOR, ".css-1qn0b6x")
             print(f"Found {len(business_elements)} businesses on Yelp")
             
             for business in business_elements:
@@ -195,10 +267,13 @@ class SeleniumLeadScraper:
                     business_name = name_element.text.strip()
                     business_url = name_element.get_attribute("href")
                     
-                    leads.append({
+                    lead = {
                         'title': business_name,
                         'url': business_url
-                    })
+                    }
+                    leads.append(lead)
+                    if on_lead:
+                        on_lead(lead)
                 except:
                     continue
                     
@@ -208,15 +283,24 @@ class SeleniumLeadScraper:
         return leads
     
     def scrape_website(self, url):
-        """Scrape a website for contact information using Selenium."""
+        """
+        Scrape a website for contact information using Selenium. 'fetched' in
+        the result is False when the site was disallowed or could not be loaded.
+        """
         contact_info = {
             'url': url,
             'email': None,
             'phone': None,
-            'contact_page': None
+            'address': None,
+            'contact_page': None,
+            'fetched': False
         }
         
         try:
+            if not self.robots.can_fetch(url):
+                print(f"Skipping {url}: disallowed by robots.txt")
+                return contact_info
+            
             print(f"Accessing: {url}")
             self.driver.get(url)
             
@@ -225,62 +309,46 @@ class SeleniumLeadScraper:
             
             # Get the page source after JavaScript renders
             page_source = self.driver.page_source
+            contact_info['fetched'] = True
             
-            # Extract email addresses
-            emails = re.findall(r'[\w.+-]+@[\w-]+\.[\w.-]+', page_source)
-            if emails:
-                # Filter out common false positives
-                valid_emails = [email for email in emails if not (
-                    'example' in email or 
-                    'youremail' in email or 
-                    'domain.com' in email
-                )]
-                if valid_emails:
-                    contact_info['email'] = valid_emails[0]
-                    print(f"Found email: {contact_info['email']}")
+            # Extract email addresses, filtering out common false positives
+            valid_emails = plausible_emails(page_source)
+            if valid_emails:
+                contact_info['email'] = valid_emails[0]
+                print(f"Found email: {contact_info['email']}")
             
             # Extract phone numbers
-            phone_pattern = re.compile(r'(\+\d{1,3}[-.\s]?)?(\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})')
-            phones = phone_pattern.findall(page_source)
+            phones = find_phones(page_source)
             if phones:
-                contact_info['phone'] = ''.join(phones[0]).strip()
+                contact_info['phone'] = phones[0]
                 print(f"Found phone: {contact_info['phone']}")
             
-            # Find contact page
+            # Fetch the best ranked contact/about/imprint pages over HTTP in
+            # parallel until both an email and a phone number have been found
             try:
-                contact_links = self.driver.find_elements(By.XPATH, "//a[contains(translate(text(), 'CONTACT', 'contact'), 'contact') or contains(@href, 'contact')]")
+                contact_info = self.contact_discovery.discover(url, page_source, contact_info)
                 
-                if contact_links:
-                    contact_href = contact_links[0].get_attribute("href")
-                    if contact_href:
-                        contact_info['contact_page'] = contact_href
-                        print(f"Found contact page: {contact_info['contact_page']}")
-                        
-                        # Visit the contact page
-                        if contact_info['contact_page'] != url:
-                            print(f"Visiting contact page: {contact_info['contact_page']}")
-                            self.driver.get(contact_info['contact_page'])
-                            time.sleep(3)
-                            
-                            # Extract additional info from contact page
-                            contact_page_source = self.driver.page_source
-                            
-                            # Look for emails on the contact page
-                            contact_emails = re.findall(r'[\w.+-]+@[\w-]+\.[\w.-]+', contact_page_source)
-                            valid_contact_emails = [email for email in contact_emails if not (
-                                'example' in email or 
-                                'youremail' in email or 
-                                'domain.com' in email
-                            )]
-                            if valid_contact_emails and not contact_info['email']:
-                                contact_info['email'] = valid_contact_emails[0]
-                                print(f"Found email on contact page: {contact_info['email']}")
-                            
-                            # Look for phone numbers on the contact page
-                            contact_phones = phone_pattern.findall(contact_page_source)
-                            if contact_phones and not contact_info['phone']:
-                                contact_info['phone'] = ''.join(contact_phones[0]).strip()
-                                print(f"Found phone on contact page: {contact_info['phone']}")
+                # Fall back to rendering the best candidate for JavaScript-only pages
+                if contact_info['contact_page'] and not (contact_info['email'] and contact_info['phone']):
+                    print(f"Visiting contact page: {contact_info['contact_page']}")
+                    time.sleep(self.robots.crawl_delay(url))
+                    self.driver.get(contact_info['contact_page'])
+                    time.sleep(3)
+                    
+                    # Extract additional info from contact page
+                    contact_page_source = self.driver.page_source
+                    
+                    # Look for emails on the contact page
+                    valid_contact_emails = plausible_emails(contact_page_source)
+                    if valid_contact_emails and not contact_info['email']:
+                        contact_info['email'] = valid_contact_emails[0]
+                        print(f"Found email on contact page: {contact_info['email']}")
+                    
+                    # Look for phone numbers on the contact page
+                    contact_phones = find_phones(contact_page_source)
+                    if contact_phones and not contact_info['phone']:
+                        contact_info['phone'] = contact_phones[0]
+                        print(f"Found phone on contact page: {contact_info['phone']}")
             
             except Exception as e:
                 print(f"Error looking for contact page: {e}")
@@ -290,9 +358,60 @@ class SeleniumLeadScraper:
         
         return contact_info
     
+    def _fan_out_sources(self, term, formatted_term, location=None):
+        """
+        Run every lead source concurrently, each on its own browser, and yield
+        each lead as soon as its source finds it, so website scraping starts
+        while the sources are still paging through results.
+        """
+        sources = {
+            'google': (self.search_google, (formatted_term,)),
+            'linkedin': (self.search_linkedin, (term, location)),
+        }
+        if location:
+            sources['yelp'] = (self.search_yelp, (term, location))
+        
+        # Start any missing browsers up front so they boot in parallel too
+        with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+            futures = {executor.submit(self._get_source_driver, name): name for name in sources}
+            drivers = {}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    drivers[name] = future.result()
+                except Exception as e:
+                    print(f"Error starting browser for {name}: {e}")
+            
+            # Sources push every lead onto the queue as they find it, then a
+            # marker once they are done
+            found = queue.Queue()
+            finished = object()
+            
+            def run_source(name, method, args):
+                try:
+                    leads = method(*args, driver=drivers[name], on_lead=found.put)
+                    print(f"{name} returned {len(leads)} leads")
+                except Exception as e:
+                    print(f"Error in {name} search: {e}")
+                finally:
+                    found.put(finished)
+            
+            running = 0
+            for name, (method, args) in sources.items():
+                if name in drivers:
+                    executor.submit(run_source, name, method, args)
+                    running += 1
+            while running:
+                lead = found.get()
+                if lead is finished:
+                    running -= 1
+                else:
+                    yield lead
+    
     def find_leads(self, search_terms, location=None):
         """Find leads using multiple search methods."""
         all_leads = []
+        leads_in_run = set()
         
         for term in search_terms:
             # Combine search term with location if provided
@@ -303,54 +422,59 @@ class SeleniumLeadScraper:
                 
             print(f"\n--- Searching for: {formatted_term} ---")
             
-            # Get leads from Google
-            google_leads = self.search_google(formatted_term)
-            
-            # Get leads from LinkedIn
-            linkedin_leads = self.search_linkedin(term, location)
-            
-            # Get leads from Yelp if location is provided
-            yelp_leads = self.search_yelp(term, location) if location else []
-            
-            # Combine all lead sources
-            combined_leads = google_leads + linkedin_leads + yelp_leads
-            
-            # Create a set to track URLs we've seen
-            processed_urls = set()
-            
-            # Process each lead
-            for lead in combined_leads:
-                if lead['url'] in processed_urls:
-                    continue  # Skip duplicate URLs
-                    
-                processed_urls.add(lead['url'])
+            # Process each lead as soon as a source has found it
+            for lead in self._fan_out_sources(term, formatted_term, location):
+                # Skip domains already scraped under another term, URL variant or run
+                key = dedup_key(lead['url'])
+                known_lead = self.domain_index.attach_term(lead['url'], term)
+                if known_lead is not None:
+                    if key not in leads_in_run:
+                        leads_in_run.add(key)
+                        all_leads.append(known_lead)
+                    print(f"Already scraped {key}, recorded search term '{term}'")
+                    continue
+                if key in leads_in_run:
+                    # Failed earlier in this run; retried in the next one
+                    continue
                 
                 print(f"\nProcessing lead: {lead['title']}")
                 contact_info = self.scrape_website(lead['url'])
                 
-                lead_info = {
-                    'title': lead['title'],
-                    'url': lead['url'],
-                    'email': contact_info['email'],
-                    'phone': contact_info['phone'],
-                    'contact_page': contact_info['contact_page'],
-                    'search_term': term,
-                    'location': location
-                }
+                lead_info = Lead(
+                    title=lead['title'],
+                    url=lead['url'],
+                    email=contact_info['email'],
+                    phone=contact_info['phone'],
+                    address=contact_info['address'],
+                    contact_page=contact_info['contact_page'],
+                    location=location
+                )
                 
+                # Only sites that loaded are indexed, so failures are retried next run
+                if contact_info['fetched']:
+                    lead_info = self.domain_index.add(lead_info, term)
+                else:
+                    lead_info.search_terms = [term]
+                leads_in_run.add(key)
                 all_leads.append(lead_info)
-                print(f"Added lead with {'contact info' if lead_info['email'] or lead_info['phone'] else 'no contact info'}")
+                print(f"Added lead with {'contact info' if lead_info.has_contact() else 'no contact info'}")
                 
                 # Be respectful with rate limiting
                 time.sleep(random.uniform(1, 3))
+            
+            self.domain_index.save()
+            self.robots.save()
         
+        print(f"\n{self.contact_discovery.report()}")
         self.results = all_leads
         return all_leads
     
     def save_to_csv(self, filename='selenium_leads.csv'):
         """Save the results to a CSV file."""
+        import pandas as pd
+        
         if self.results:
-            df = pd.DataFrame(self.results)
+            df = pd.DataFrame(leads_to_rows(self.results, CSV_COLUMNS), columns=CSV_COLUMNS)
             
             # Filter out leads with no contact information
             leads_with_contact = df[(df['email'].notna()) | (df['phone'].notna())]
@@ -379,9 +503,21 @@ class SeleniumLeadScraper:
         else:
             print("No leads found.")
             # Create empty CSV file with headers
-            columns = ['title', 'url', 'email', 'phone', 'contact_page', 'search_term', 'location']
-            pd.DataFrame(columns=columns).to_csv(filename, index=False)
+            pd.DataFrame(columns=CSV_COLUMNS).to_csv(filename, index=False)
             print(f"Created empty leads file: {filename}")
+    
+    def save_to_parquet(self, filename='selenium_leads.parquet'):
+        """Write the results to Parquet (or Arrow IPC for .arrow) in record batches."""
+        with LeadBatchWriter(filename, columns=CSV_COLUMNS) as writer:
+            writer.write_all(self.results)
+        print(f"Saved {writer.written} leads to {filename}")
+    
+    def save_to_store(self, db_path='leads.db'):
+        """Merge the results into the shared SQLite lead store."""
+        with LeadStore(db_path) as store:
+            inserted, updated = store.merge(self.results)
+            total = len(store)
+        print(f"Merged into {db_path}: {inserted} new, {updated} updated, {total} leads in store")
 
 # Example usage
 if __name__ == "__main__":
@@ -389,9 +525,6 @@ if __name__ == "__main__":
         # Ask if user wants to run in headless mode
         headless = input("Run in headless mode? (y/n, default: y): ").lower() != 'n'
         
-        # Initialize the scraper
-        scraper = SeleniumLeadScraper(headless=headless)
-        
         # Get user input
         print("\n--- FREELANCE LEAD GENERATOR ---")
         print("Enter your search terms separated by commas (related to your skills or target clients)")
@@ -405,12 +538,20 @@ if __name__ == "__main__":
             print("Limiting to first 5 search terms to avoid long processing time")
             search_terms = search_terms[:5]
         
+        write_parquet = input("Also save results as Parquet? (y/n, default: n): ").lower() == 'y'
+        
+        # Initialize the scraper once all questions are answered
+        scraper = SeleniumLeadScraper(headless=headless)
+        
         # Find leads
         print(f"\nStarting lead generation for {len(search_terms)} search terms...")
         leads = scraper.find_leads(search_terms, location)
         
         # Save results
         scraper.save_to_csv()
+        if write_parquet:
+            scraper.save_to_parquet()
+        scraper.save_to_store()
         
         print("\n===== LEAD GENERATION COMPLETE =====")
         
@@ -1,185 +1,350 @@
 import time
-import re
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from scrapekit.chrome import new_chrome_driver
+from scrapekit.leadstore import LeadStore
+from scrapekit.maps import DETAILS_NAME_SELECTOR, FEED_CARDS_SCRIPT, FeedTracker, parse_feed_card
+from scrapekit.placecache import DEFAULT_CACHE_PATH, DETAIL_FIELDS, WEBSITE_FIELDS, PlaceCache
+from scrapekit.profiles import DEFAULT_PROFILE_ROOT, ProfileStore
+from scrapekit.records import Lead, LeadBatchWriter, leads_to_rows
+from scrapekit.timing import StageTimer
+
+# Lead fields written to CSV; the business name is stored as the lead title
+CSV_COLUMNS = ['title', 'address', 'phone', 'website', 'email', 'rating', 'reviews', 'category']
+
+# Fields a feed card provides, cached for every listing seen
+FEED_FIELDS = ['title', 'url', 'rating', 'reviews', 'category', 'address', 'phone', 'website']
+
+# pandas, selenium and the website lookup queue (asyncio, urllib) are imported
+# inside the methods that use them so the prompts come up immediately instead
+# of after several seconds of imports.
+
+class SearchError(Exception):
+    """A search that failed (CAPTCHA, timeout, browser crash) rather than found nothing."""
 
 class GoogleMapsBusinessScraper:
-    def __init__(self, headless=True):
-        """Initialize the scraper with browser options."""
-        self.options = Options()
-        if headless:
-            self.options.add_argument("--headless")
-        self.options.add_argument("--no-sandbox")
-        self.options.add_argument("--disable-dev-shm-usage")
-        self.options.add_argument("--disable-blink-features=AutomationControlled")
-        self.options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        self.options.add_experimental_option("useAutomationExtension", False)
+    def __init__(self, headless=True, profile_dir=DEFAULT_PROFILE_ROOT, profile_cap_mb=2048, worker=0,
+                 detail_workers=3, details_timeout=15, lookup_emails=True, place_cache=DEFAULT_CACHE_PATH,
+                 timer=None):
+        """
+        Initialize the scraper with browser options.
+        
+        The browser keeps a persistent profile and disk cache under profile_dir
+        so the Maps JS bundles and fonts are not downloaded on every run; pass
+        None for a throwaway profile. Use a different worker number for each
+        scraper running at the same time.
+        
+        Place details are read by up to detail_workers browsers at once, each
+        waiting up to details_timeout seconds for a place page to render.
+        With lookup_emails, business websites are searched for an email
+        address over HTTP in the background; the browsers stay on Maps.
+        
+        Details of every place are kept in the place_cache database (pass
+        None to disable it), so repeat searches only open place pages and
+        websites for new places or ones whose cached fields went stale.
+        
+        Every stage of a run (page loads, scrolls, detail pages, website
+        fetches, writes) is timed by timer; see timer.report() and
+        timer.export_trace(). Pass a shared StageTimer to time several scrapers.
+        """
+        from selenium.webdriver.support.ui import WebDriverWait
+        
+        self.headless = headless
+        self.worker = worker
+        self.detail_workers = detail_workers
+        self.details_timeout = details_timeout
+        self.lookup_emails = lookup_emails
+        self.timer = timer or StageTimer()
+        self.place_cache = PlaceCache(place_cache) if place_cache else None
+        
+        self.profile_store = None
+        if profile_dir:
+            self.profile_store = ProfileStore(profile_dir, max_size_mb=profile_cap_mb)
+            self.profile_store.cleanup()
         
         # Initialize the driver
-        self.driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=self.options
-        )
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        self.driver = self._create_driver(worker)
         self.wait = WebDriverWait(self.driver, 10)
+    
+    def _chrome_options(self, worker):
+        from selenium.webdriver.chrome.options import Options
+        
+        options = Options()
+        if self.headless:
+            options.add_argument("--headless")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        options.add_experimental_option("useAutomationExtension", False)
+        
+        if self.profile_store:
+            self.profile_store.apply(options, 'google-maps', worker)
+        return options
+    
+    def _create_driver(self, worker):
+        with self.timer.span('browser_start', worker=worker):
+            driver = new_chrome_driver(self._chrome_options(worker))
+            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        return driver
 
-    def search_businesses(self, query, location, max_results=20):
-        """Search for businesses on Google Maps based on query and location."""
+    def search_businesses(self, query, location, max_results=20, mode='feed', area=None, raise_errors=False):
+        """
+        Search for businesses on Google Maps based on query and location.
+        
+        mode='feed' reads every loaded result card in one script call per
+        scroll; mode='details' then opens the place pages across
+        detail_workers browsers to complete their details.
+        
+        With area=(lat, lng, zoom) the query is searched in that map viewport
+        instead of near location; see scrapekit.maps.Tile.
+        
+        Errors are printed and give an empty list, unless raise_errors is
+        set: then a failed search raises SearchError, so callers can tell it
+        from a search without results.
+        """
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from scrapekit.lookup import WebsiteLookupQueue
+        
         try:
             # Format the search URL
             # Try this format instead
             search_url = f"https://www.google.com/maps/search/{query.replace(' ', '+')}+near+{location.replace(' ', '+')}"
-            self.driver.get(search_url)
-            time.sleep(5)  # Let the page load
-            
-            self.wait = WebDriverWait(self.driver, 15)  # Increase from 10 to 15
-            
-            # Wait for results to load
-            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div[role='feed']")))
+            if area:
+                lat, lng, zoom = area
+                search_url = f"https://www.google.com/maps/search/{query.replace(' ', '+')}/@{lat:.6f},{lng:.6f},{zoom}z"
+            with self.timer.span('page_load', url=search_url):
+                self.driver.get(search_url)
+                time.sleep(5)  # Let the page load
+                
+                self.wait = WebDriverWait(self.driver, 15)  # Increase from 10 to 15
+                
+                # Wait for results to load
+                self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div[role='feed']")))
             
             # Add this right after loading the page to see what's happening
             print(f"Page title: {self.driver.title}")
             print(f"Current URL: {self.driver.current_url}")
             
             # Add this after loading the page
-            if "captcha" in self.driver.page_source.lower() or "unusual traffic" in self.driver.page_source.lower():
+            with self.timer.span('captcha_check'):
+                page_source = self.driver.page_source.lower()
+            if "captcha" in page_source or "unusual traffic" in page_source:
                 print("Google is requesting verification. Please run in non-headless mode and manually solve the CAPTCHA.")
+                if raise_errors:
+                    raise SearchError("Google is requesting verification (CAPTCHA)")
                 return []
             
-            businesses = []
-            current_count = 0
-            last_height = self.driver.execute_script("return document.body.scrollHeight")
-
-            # Scroll to load more results
-            while current_count < max_results:
-                # Get all currently visible business listings
-                business_elements = self.driver.find_elements(By.CSS_SELECTOR, "div[role='article']")
-                
-                # Process only new results
-                for element in business_elements[current_count:]:
-                    if current_count >= max_results:
-                        break
-                    
-                    try:
-                        # Click to open the business details
-                        element.click()
-                        time.sleep(2)
-                        
-                        # Extract business info
-                        business_data = self._extract_business_info()
-                        if business_data:
-                            businesses.append(business_data)
-                            current_count += 1
-                            print(f"Extracted data for: {business_data['name']} ({current_count}/{max_results})")
-                        
-                        # Go back to the list
-                        self.driver.find_element(By.CSS_SELECTOR, "button[aria-label='Back']").click()
-                        time.sleep(1)
-                        
-                    except Exception as e:
-                        print(f"Error processing business: {e}")
-                        continue
-                
-                # Scroll down to load more
-                self.driver.execute_script("document.querySelector('div[role=\"feed\"]').scrollTop += 500")
-                time.sleep(2)
-                
-                # Check if we've reached the end of the feed
-                new_height = self.driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    # Try clicking the "More results" button if available
-                    try:
-                        more_button = self.driver.find_element(By.CSS_SELECTOR, "button[jsaction='pane.paginationSection.nextPage']")
-                        more_button.click()
-                        time.sleep(2)
-                    except NoSuchElementException:
-                        print("No more results to load.")
-                        break
-                last_height = new_height
-            
+            # Websites are looked up while the browsers keep working through Maps
+            lookup = WebsiteLookupQueue(timer=self.timer).start() if self.lookup_emails else None
+            try:
+                businesses = self._collect_from_feed(max_results, lookup)
+                if mode == 'details':
+                    stale = [business for business in businesses
+                             if not self._cached(business, DETAIL_FIELDS)]
+                    print(f"{len(businesses) - len(stale)} places have fresh cached details")
+                    read = self.extract_place_details(stale, lookup=lookup)
+                    if self.place_cache:
+                        self.place_cache.update(read, DETAIL_FIELDS, include_empty=True)
+            finally:
+                if lookup:
+                    print("Waiting for website lookups to finish...")
+                    with self.timer.span('lookup_drain'):
+                        lookup.join()
+                    if self.place_cache:
+                        self.place_cache.update(lookup.completed, WEBSITE_FIELDS, include_empty=True)
+            if self.place_cache:
+                print(self.place_cache.report())
             return businesses
             
+        except SearchError:
+            raise
         except Exception as e:
             print(f"An error occurred during search: {e}")
+            if raise_errors:
+                raise SearchError(str(e)) from e
             return []
     
-    def _extract_business_info(self):
+    def _scroll_feed(self):
+        """Scroll to the bottom of the results feed so Maps loads the next batch."""
+        with self.timer.span('scroll'):
+            self.driver.execute_script(
+                "const feed = document.querySelector('div[role=\"feed\"]'); feed.scrollTop = feed.scrollHeight"
+            )
+            time.sleep(2)
+    
+    def _next_results_page(self):
+        """Click the "More results" button if there is one."""
+        from selenium.webdriver.common.by import By
+        from selenium.common.exceptions import NoSuchElementException
+        
+        with self.timer.span('next_page'):
+            try:
+                self.driver.find_element(By.CSS_SELECTOR, "button[jsaction='pane.paginationSection.nextPage']").click()
+                time.sleep(2)
+                return True
+            except NoSuchElementException:
+                return False
+    
+    def _new_feed_cards(self, tracker):
+        """Cards for places not seen yet; an empty list means the feed is exhausted."""
+        with self.timer.span('feed_read'):
+            new_cards = tracker.new_cards(self.driver.execute_script(FEED_CARDS_SCRIPT) or [])
+        if not new_cards and self._next_results_page():
+            with self.timer.span('feed_read'):
+                new_cards = tracker.new_cards(self.driver.execute_script(FEED_CARDS_SCRIPT) or [])
+        if not new_cards:
+            print(f"No new listings after scrolling, stopping at {len(tracker)} places.")
+        return new_cards
+    
+    def _cached(self, business, fields):
+        return bool(self.place_cache) and self.place_cache.is_fresh(business.place_id, fields)
+    
+    def _queue_lookup(self, lookup, business):
+        """Hand a business to the website lookup unless its website details are cached."""
+        if lookup and not self._cached(business, WEBSITE_FIELDS):
+            lookup.submit(business)
+    
+    def _collect_from_feed(self, max_results, lookup=None):
+        """Parse newly loaded result cards in bulk after each scroll."""
+        businesses = []
+        tracker = FeedTracker()
+        
+        while len(businesses) < max_results:
+            new_cards = self._new_feed_cards(tracker)
+            if not new_cards:
+                break
+            for card in new_cards[:max_results - len(businesses)]:
+                business_data = parse_feed_card(card)
+                if self.place_cache:
+                    # The card's values are the newest; cached ones fill the gaps
+                    self.place_cache.update([business_data], FEED_FIELDS)
+                    self.place_cache.fill(business_data)
+                businesses.append(business_data)
+                print(f"Extracted data for: {business_data.title} ({len(businesses)}/{max_results})")
+                self._queue_lookup(lookup, business_data)
+            self._scroll_feed()
+        
+        return businesses
+    
+    def _wait_for_details(self, driver):
+        """Readiness policy shared by every detail worker: the place name has rendered."""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        
+        with self.timer.span('detail_wait'):
+            return WebDriverWait(driver, self.details_timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, DETAILS_NAME_SELECTOR))
+            )
+    
+    def extract_place_details(self, businesses, workers=None, lookup=None):
+        """
+        Open each business's place page to complete the details from its feed
+        card. Pages are spread over up to `workers` browsers (the search
+        browser plus extra ones started here); whatever the details pane
+        shows is merged back into the businesses in feed order, and websites
+        first found here are handed to the lookup queue. Returns the
+        businesses whose place page was read.
+        """
+        pending = iter([index for index, business in enumerate(businesses) if business.url])
+        total = sum(1 for business in businesses if business.url)
+        workers = max(1, min(workers or self.detail_workers, total))
+        lock = threading.Lock()
+        details = {}
+        
+        def run_worker(number):
+            driver = self.driver if number == 0 else self._create_driver(f"{self.worker}-{number}")
+            try:
+                while True:
+                    with lock:
+                        index = next(pending, None)
+                    if index is None:
+                        return
+                    try:
+                        with self.timer.span('detail_load', url=businesses[index].url):
+                            driver.get(businesses[index].url)
+                        result = self._extract_business_info(driver)
+                    except Exception as e:
+                        print(f"Error loading {businesses[index].title}: {e}")
+                        result = None
+                    with lock:
+                        if result:
+                            details[index] = result
+                        print(f"Details {len(details)}/{total}: {businesses[index].title}")
+            finally:
+                if number != 0:
+                    driver.quit()
+        
+        print(f"Reading details for {total} places with {workers} browsers...")
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for future in [pool.submit(run_worker, number) for number in range(workers)]:
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Detail worker failed: {e}")
+        
+        for index, result in sorted(details.items()):
+            for field in CSV_COLUMNS:
+                value = getattr(result, field)
+                if value:
+                    setattr(businesses[index], field, value)
+            self._queue_lookup(lookup, businesses[index])
+        return [businesses[index] for index in sorted(details)]
+    
+    def _extract_business_info(self, driver=None):
         """Extract business details from the details pane."""
+        from selenium.webdriver.common.by import By
+        from selenium.common.exceptions import NoSuchElementException
+        
+        driver = driver or self.driver
         try:
             # Wait for the details pane to load
-            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.fontHeadlineSmall")))
+            name_element = self._wait_for_details(driver)
             
             # Extract business name
-            name_element = self.driver.find_element(By.CSS_SELECTOR, "div.fontHeadlineSmall")
-            name = name_element.text if name_element else "N/A"
+            name = name_element.text if name_element else None
             
-            # Initialize business data
-            business_data = {
-                "name": name,
-                "address": "N/A",
-                "phone": "N/A",
-                "website": "N/A",
-                "email": "N/A",
-                "rating": "N/A",
-                "reviews": "N/A",
-                "category": "N/A"
-            }
+            # Initialize business data; missing fields are written as N/A
+            business_data = Lead(title=name, source='google_maps')
             
             # Extract other info
-            info_elements = self.driver.find_elements(By.CSS_SELECTOR, "div[role='button'][aria-label]")
+            info_elements = driver.find_elements(By.CSS_SELECTOR, "div[role='button'][aria-label], [data-item-id][aria-label]")
             
             for element in info_elements:
                 aria_label = element.get_attribute("aria-label") or ""
                 
                 if "Address" in aria_label:
-                    business_data["address"] = element.text
+                    business_data.address = element.text
                 elif "Phone" in aria_label:
-                    business_data["phone"] = element.text
+                    business_data.phone = element.text
                 elif "Website" in aria_label:
-                    # Click to go to website
-                    element.click()
-                    time.sleep(1)
-                    
-                    # Get the opened tab with the website
-                    tabs = self.driver.window_handles
-                    if len(tabs) > 1:
-                        self.driver.switch_to.window(tabs[1])
-                        business_data["website"] = self.driver.current_url
-                        
-                        # Try to extract email from the website
-                        email = self._extract_email_from_website()
-                        if email:
-                            business_data["email"] = email
-                        
-                        # Close the website tab and switch back
-                        self.driver.close()
-                        self.driver.switch_to.window(tabs[0])
+                    # Read the link instead of following it; emails are looked up over HTTP
+                    business_data.website = element.get_attribute("href") or business_data.website
             
             # Extract rating and reviews if available
             try:
-                rating_element = self.driver.find_element(By.CSS_SELECTOR, "div.fontBodyMedium span:first-child")
+                rating_element = driver.find_element(By.CSS_SELECTOR, "div.fontBodyMedium span:first-child")
                 rating_text = rating_element.text
                 if rating_text:
                     parts = rating_text.split()
                     if len(parts) >= 1:
-                        business_data["rating"] = parts[0]
+                        business_data.rating = parts[0]
                     if len(parts) >= 2 and parts[1].startswith('(') and parts[1].endswith(')'):
-                        business_data["reviews"] = parts[1].strip('()')
+                        business_data.reviews = parts[1].strip('()')
             except NoSuchElementException:
                 pass
             
             # Extract category
             try:
-                category_element = self.driver.find_element(By.CSS_SELECTOR, "button[jsaction='pane.rating.category']")
-                business_data["category"] = category_element.text
+                category_element = driver.find_element(By.CSS_SELECTOR, "button[jsaction='pane.rating.category']")
+                business_data.category = category_element.text
             except NoSuchElementException:
                 pass
                 
@@ -189,77 +354,68 @@ class GoogleMapsBusinessScraper:
             print(f"Error extracting business info: {e}")
             return None
     
-    def _extract_email_from_website(self):
-        """Extract email addresses from the current website."""
-        try:
-            # Get page source
-            page_source = self.driver.page_source
-            
-            # Use regex to find email addresses
-            email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-            emails = re.findall(email_pattern, page_source)
-            
-            # Check for common contact page patterns and visit if found
-            contact_links = self.driver.find_elements(By.XPATH, 
-                "//a[contains(translate(text(), 'CONTACT', 'contact'), 'contact') or @href[contains(., 'contact')]]")
-            
-            if contact_links and len(contact_links) > 0:
-                try:
-                    contact_links[0].click()
-                    time.sleep(2)
-                    # Try to find emails on the contact page
-                    contact_page_source = self.driver.page_source
-                    contact_emails = re.findall(email_pattern, contact_page_source)
-                    emails.extend(contact_emails)
-                except:
-                    pass
-            
-            # Return the first valid email or None
-            valid_emails = [email for email in set(emails) 
-                          if not email.endswith(('.png', '.jpg', '.jpeg', '.gif', '.svg')) 
-                          and 'example' not in email
-                          and not email.startswith(('jquery', 'example', 'name@', 'info@example'))]
-            
-            return valid_emails[0] if valid_emails else None
-            
-        except Exception as e:
-            print(f"Error extracting email: {e}")
-            return None
-    
     def save_to_csv(self, businesses, filename="business_leads.csv"):
         """Save the extracted business data to a CSV file."""
+        import pandas as pd
+        
         if not businesses:
             print("No businesses to save.")
             return
         
-        df = pd.DataFrame(businesses)
-        df.to_csv(filename, index=False)
+        with self.timer.span('csv_write', rows=len(businesses)):
+            df = pd.DataFrame(leads_to_rows(businesses, CSV_COLUMNS), columns=CSV_COLUMNS)
+            df.rename(columns={'title': 'name'}).to_csv(filename, index=False, na_rep='N/A')
         print(f"Saved {len(businesses)} businesses to {filename}")
     
+    def save_to_parquet(self, businesses, filename="business_leads.parquet"):
+        """Write the business leads to Parquet (or Arrow IPC for .arrow) in record batches."""
+        with self.timer.span('parquet_write', rows=len(businesses)):
+            with LeadBatchWriter(filename, columns=CSV_COLUMNS) as writer:
+                writer.write_all(businesses)
+        print(f"Saved {writer.written} businesses to {filename}")
+    
+    def save_to_store(self, businesses, db_path='leads.db'):
+        """Merge the business leads into the shared SQLite lead store."""
+        with self.timer.span('store_merge', rows=len(businesses)), LeadStore(db_path) as store:
+            inserted, updated = store.merge(businesses)
+            total = len(store)
+        print(f"Merged into {db_path}: {inserted} new, {updated} updated, {total} leads in store")
+    
     def close(self):
         """Close the browser and end the session."""
         if self.driver:
             self.driver.quit()
+        if self.place_cache:
+            self.place_cache.close()
 
 def main():
+    # Get user input before starting the browser
+    search_query = input("Enter business type to search (e.g., plumber, dentist): ")
+    location = input("Enter location (e.g., Portland, OR): ")
+    max_results = int(input("Maximum number of businesses to scrape (default 20): ") or "20")
+    lookup_emails = input("Look up emails on business websites? (y/n, default: y): ").lower() != 'n'
+    open_details = input("Open each result's page for full details? (slower) (y/n, default: n): ").lower() == 'y'
+    detail_workers = int(input("Browsers to open results with (default 3): ") or "3") if open_details else 1
+    write_parquet = input("Also save results as Parquet? (y/n, default: n): ").lower() == 'y'
+    write_trace = input("Save a timing trace of the run? (y/n, default: n): ").lower() == 'y'
+    
     # Example usage
-    scraper = GoogleMapsBusinessScraper(headless=False)  # Set to True for headless mode
+    scraper = GoogleMapsBusinessScraper(headless=False, detail_workers=detail_workers, lookup_emails=lookup_emails)  # Set to True for headless mode
     try:
-        # Get user input
-        search_query = input("Enter business type to search (e.g., plumber, dentist): ")
-        location = input("Enter location (e.g., Portland, OR): ")
-        max_results = int(input("Maximum number of businesses to scrape (default 20): ") or "20")
-        
         print(f"Searching for {search_query} in {location}...")
-        businesses = scraper.search_businesses(search_query, location, max_results)
+        businesses = scraper.search_businesses(search_query, location, max_results,
+                                               mode='details' if open_details else 'feed')
         
         if businesses:
             filename = f"{search_query.replace(' ', '_')}_{location.replace(' ', '_')}.csv"
             scraper.save_to_csv(businesses, filename)
+            if write_parquet:
+                scraper.save_to_parquet(businesses, filename.replace('.csv', '.parquet'))
+            scraper.save_to_store(businesses)
             
             # Display stats
-            emails_found = sum(1 for b in businesses if b["email"] != "N/A")
-            websites_found = sum(1 for b in businesses if b["website"] != "N/A")
+            emails_found = sum(1 for b in businesses if b.email)
+            websites_found = sum(1 for b in businesses if b.website)
             
             print(f"\nSummary:")
             print(f"Total businesses scraped: {len(businesses)}")
@@ -268,6 +424,13 @@ def main():
             print(f"Data saved to {filename}")
         else:
             print("No businesses found.")
+        
+        print("\nStage timings:")
+        print(scraper.timer.report(items=len(businesses), item_name='businesses'))
+        if write_trace:
+            trace_file = f"{search_query.replace(' ', '_')}_{location.replace(' ', '_')}_trace.json"
+            scraper.timer.export_trace(trace_file)
+            print(f"Timing trace saved to {trace_file} (open in chrome://tracing or ui.perfetto.dev)")
     
     finally:
         scraper.close()
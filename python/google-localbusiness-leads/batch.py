@@ -0,0 +1,333 @@
+"""
+Batch Google Maps scraping for many (query, location) pairs.
+
+Jobs are read from a CSV file with query, location and an optional
+max_results column:
+
+    query,location,max_results
+    plumber,"Portland, OR",40
+    dentist,"Austin, TX",
+
+They are spread over --workers worker processes, each keeping one browser
+open for all of its jobs. A job that fails or comes back empty (e.g. a
+CAPTCHA page) is retried up to --retries times with a fresh browser. All
+results are merged into one CSV with one row per place (keyed by Maps place
+ID) and into the shared lead store.
+
+    python batch.py jobs.csv --workers 4 --out batch_leads.csv
+
+A single search only exposes a limited feed, so a whole metro area can be
+covered instead with --bbox: the box is split into a grid of --cell-km
+tiles, each searched as its own map viewport in parallel. Tiles whose feed
+comes back (nearly) full are split into quadrants, up to --max-depth times.
+
+    python batch.py --query plumber --location "Portland, OR" \\
+        --bbox 45.43,-122.84,45.65,-122.47 --cell-km 4 --workers 4
+
+With --trace, every worker times its stages and the timings of all
+workers are combined into one Chrome trace file.
+"""
+import argparse
+import csv
+import glob
+import multiprocessing
+import multiprocessing.util
+import os
+import queue
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from scrapekit.leadstore import LeadStore
+from scrapekit.maps import coords_from_url, tile_grid
+from scrapekit.records import leads_to_rows
+from scrapekit.timing import StageTimer, merge_traces
+
+from app import CSV_COLUMNS, GoogleMapsBusinessScraper
+
+OUTPUT_COLUMNS = CSV_COLUMNS + ['url', 'industry', 'location', 'search_terms', 'place_id']
+
+# Per-process state set up by _init_worker
+_scraper = None
+_scraper_options = {}
+_worker_id = None
+_timer = None
+_trace_dir = None
+
+
+def read_jobs(path, default_max_results=20):
+    """Read (query, location, max_results) jobs from a CSV file."""
+    jobs = []
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            query = (row.get('query') or '').strip()
+            location = (row.get('location') or '').strip()
+            if not query or query.startswith('#'):
+                continue
+            max_results = int(row.get('max_results') or default_max_results)
+            jobs.append((query, location, max_results))
+    return jobs
+
+
+def _init_worker(worker_ids, options, trace_dir=None):
+    global _scraper_options, _worker_id, _timer, _trace_dir
+    _worker_id = worker_ids.get()
+    _scraper_options = options
+    # One timer per process, kept across browser restarts
+    _timer = StageTimer()
+    _trace_dir = trace_dir
+    # Pool workers skip atexit handlers, but run multiprocessing finalizers on a clean exit
+    multiprocessing.util.Finalize(None, _close_scraper, exitpriority=10)
+
+
+def _close_scraper():
+    global _scraper
+    if _scraper is not None:
+        _scraper.close()
+        _scraper = None
+    if _timer is not None and _timer.spans:
+        print(f"[worker {_worker_id}] Stage timings:\n{_timer.report()}")
+    if _trace_dir:
+        _timer.export_trace(os.path.join(_trace_dir, f"worker{_worker_id}.json"))
+
+
+def _get_scraper(fresh=False):
+    """The worker process's browser, started on first use or restarted after a failure."""
+    global _scraper
+    if fresh and _scraper is not None:
+        try:
+            _scraper.close()
+        except Exception as e:
+            print(f"[worker {_worker_id}] Error closing browser: {e}")
+        _scraper = None
+    if _scraper is None:
+        _scraper = GoogleMapsBusinessScraper(worker=f"batch{_worker_id}", timer=_timer, **_scraper_options)
+    return _scraper
+
+
+def run_job(job, retries=2, mode='feed', retry_empty=True):
+    """
+    Scrape one (query, location, max_results[, area]) job in this worker's
+    browser. Returns (job, leads, error). A failed search (CAPTCHA, timeout,
+    crash) is always retried; an empty result counts as a failure too unless
+    retry_empty is off (an empty map tile is a valid answer).
+    """
+    query, location, max_results = job[:3]
+    area = job[3] if len(job) > 3 else None
+    error = None
+    for attempt in range(retries + 1):
+        try:
+            scraper = _get_scraper(fresh=attempt > 0)
+            businesses = scraper.search_businesses(query, location, max_results, mode=mode, area=area,
+                                                   raise_errors=True)
+            if businesses or not retry_empty:
+                for business in businesses:
+                    business.industry = query
+                    business.location = location
+                    business.search_terms = [f"{query} in {location}" if location else query]
+                return job, businesses, None
+            error = 'no results'
+        except Exception as e:
+            error = str(e)
+        print(f"[worker {_worker_id}] {query} in {location}: attempt {attempt + 1} failed ({error})")
+        if attempt < retries:
+            time.sleep(5 * (attempt + 1))
+    return job, [], error
+
+
+def _run_job_star(args):
+    return run_job(*args)
+
+
+def merge_by_place(leads):
+    """Collapse leads for the same place found by several jobs, keeping all their search terms."""
+    by_place = {}
+    merged = []
+    for lead in leads:
+        existing = by_place.get(lead.place_id) if lead.place_id else None
+        if existing is None:
+            if lead.place_id:
+                by_place[lead.place_id] = lead
+            merged.append(lead)
+            continue
+        existing.search_terms += [term for term in lead.search_terms if term not in existing.search_terms]
+        for field in OUTPUT_COLUMNS:
+            if field != 'search_terms' and not getattr(existing, field) and getattr(lead, field):
+                setattr(existing, field, getattr(lead, field))
+    return merged
+
+
+def _start_pool(workers, scraper_options, trace_dir=None):
+    worker_ids = multiprocessing.Queue()
+    for worker_id in range(workers):
+        worker_ids.put(worker_id)
+    return multiprocessing.Pool(workers, initializer=_init_worker,
+                                initargs=(worker_ids, scraper_options or {}, trace_dir))
+
+
+def run_batch(jobs, workers=2, retries=2, mode='feed', scraper_options=None, trace_dir=None):
+    """
+    Run all jobs across `workers` browser processes and return (leads, failed
+    jobs). Each process opens one browser, so `workers` caps the browsers
+    open at any time. With trace_dir, each process writes its stage timings
+    there as a Chrome trace when it exits.
+    """
+    workers = max(1, min(workers, len(jobs)))
+    all_leads = []
+    failed = []
+    pool = _start_pool(workers, scraper_options, trace_dir)
+    try:
+        results = pool.imap_unordered(_run_job_star, [(job, retries, mode) for job in jobs])
+        for done, (job, leads, error) in enumerate(results, 1):
+            if error:
+                failed.append((job, error))
+            all_leads.extend(leads)
+            print(f"[{done}/{len(jobs)}] {job[0]} in {job[1]}: {len(leads)} businesses"
+                  + (f" (failed: {error})" if error else ""))
+        # close/join (not terminate) so each worker shuts its browser down
+        pool.close()
+        pool.join()
+    except KeyboardInterrupt:
+        pool.terminate()
+        raise
+    return all_leads, failed
+
+
+def in_tile(tile, lead):
+    """True if the lead's Maps URL places it inside the tile; leads without coordinates are kept."""
+    coords = coords_from_url(lead.url)
+    return coords is None or tile.contains(*coords)
+
+
+def run_tiles(query, tiles, location='', workers=2, retries=1, mode='feed', scraper_options=None,
+              tile_results=120, saturation=100, max_depth=2, trace_dir=None):
+    """
+    Search every tile in parallel and return (leads, failed tiles). Maps
+    also lists places outside the viewport; those are dropped, so they
+    neither count towards a tile's saturation nor show up once per tile. A
+    tile with at least `saturation` places inside it probably hides more, so
+    it is split into four tiles that are searched as well, up to max_depth
+    levels down.
+    """
+    results = queue.Queue()
+    pending = 0
+    all_leads = []
+    failed = []
+    searched = 0
+    pool = _start_pool(workers, scraper_options, trace_dir)
+
+    def submit(tile):
+        nonlocal pending
+        lat, lng = tile.center
+        job = (query, location, tile_results, (lat, lng, tile.zoom()))
+        pool.apply_async(
+            run_job, (job, retries, mode, False),
+            callback=lambda result: results.put((tile, result)),
+            error_callback=lambda e: results.put((tile, (job, [], str(e))))
+        )
+        pending += 1
+
+    try:
+        for tile in tiles:
+            submit(tile)
+        while pending:
+            tile, (job, leads, error) = results.get()
+            pending -= 1
+            searched += 1
+            inside = [lead for lead in leads if in_tile(tile, lead)]
+            all_leads.extend(inside)
+            if error:
+                failed.append((tile, error))
+            status = f"failed: {error}" if error else f"{len(inside)} places ({len(leads) - len(inside)} outside)"
+            if len(inside) >= saturation and tile.depth < max_depth:
+                children = tile.split()
+                for child in children:
+                    submit(child)
+                status += f", splitting into {len(children)} tiles"
+            print(f"[{searched} searched, {pending} queued] {tile}: {status}")
+        pool.close()
+        pool.join()
+    except KeyboardInterrupt:
+        pool.terminate()
+        raise
+    return all_leads, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape Google Maps for many (query, location) jobs")
+    parser.add_argument("jobs", nargs="?", help="CSV file with query, location and optional max_results columns")
+    parser.add_argument("-w", "--workers", type=int, default=2, help="Browser processes to run at once (default: 2)")
+    parser.add_argument("--retries", type=int, default=2, help="Retries per failed or empty job (default: 2)")
+    parser.add_argument("--max-results", type=int, default=20, help="Default results per job (default: 20)")
+    parser.add_argument("--details", action="store_true", help="Open each place page for full details")
+    parser.add_argument("--no-emails", action="store_true", help="Skip looking up emails on business websites")
+    parser.add_argument("--headed", action="store_true", help="Show the browser windows")
+    parser.add_argument("--out", default="batch_leads.csv", help="Consolidated CSV output (default: batch_leads.csv)")
+    parser.add_argument("--db", default="leads.db", help="Lead store to merge results into (default: leads.db)")
+    parser.add_argument("--trace", help="Write a Chrome trace of all workers' stage timings to this file")
+
+    tiling = parser.add_argument_group("tiling mode")
+    tiling.add_argument("--bbox", help="Area to tile as south,west,north,east in degrees")
+    tiling.add_argument("--query", help="Business type to search in every tile")
+    tiling.add_argument("--location", default="", help="Name of the area, stored with each lead")
+    tiling.add_argument("--cell-km", type=float, default=3.0, help="Initial tile size in km (default: 3)")
+    tiling.add_argument("--tile-results", type=int, default=120, help="Results to read per tile (default: 120)")
+    tiling.add_argument("--saturation", type=int, default=100,
+                        help="Split tiles returning at least this many places (default: 100)")
+    tiling.add_argument("--max-depth", type=int, default=2, help="How many times a tile may be split (default: 2)")
+
+    args = parser.parse_args()
+    if not args.bbox and not args.jobs:
+        parser.error("give a jobs file, or --bbox and --query for tiling mode")
+    if args.bbox and not args.query:
+        parser.error("--bbox needs --query")
+
+    scraper_options = {
+        'headless': not args.headed,
+        'detail_workers': 1,
+        'lookup_emails': not args.no_emails,
+    }
+    mode = 'details' if args.details else 'feed'
+    trace_dir = None
+    if args.trace:
+        trace_dir = args.trace + '.parts'
+        os.makedirs(trace_dir, exist_ok=True)
+        for stale in glob.glob(os.path.join(trace_dir, 'worker*.json')):
+            os.remove(stale)
+
+    if args.bbox:
+        south, west, north, east = (float(value) for value in args.bbox.split(','))
+        tiles = tile_grid(south, west, north, east, args.cell_km)
+        print(f"Searching '{args.query}' in {len(tiles)} tiles with {args.workers} browsers...")
+        leads, failed = run_tiles(args.query, tiles, args.location, args.workers, args.retries, mode,
+                                  scraper_options, args.tile_results, args.saturation, args.max_depth, trace_dir)
+    else:
+        jobs = read_jobs(args.jobs, args.max_results)
+        if not jobs:
+            print(f"No jobs found in {args.jobs}")
+            return
+        print(f"Running {len(jobs)} jobs with {args.workers} browsers...")
+        leads, failed = run_batch(jobs, args.workers, args.retries, mode, scraper_options, trace_dir)
+
+    unique = merge_by_place(leads)
+    with open(args.out, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=OUTPUT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(leads_to_rows(unique, OUTPUT_COLUMNS))
+    with LeadStore(args.db) as store:
+        inserted, updated = store.merge(unique)
+
+    print(f"\n{len(leads)} results, {len(unique)} unique businesses saved to {args.out}")
+    print(f"Merged into {args.db}: {inserted} new, {updated} updated")
+    if failed:
+        print(f"{len(failed)} jobs failed after retries:")
+        for job, error in failed:
+            print(f"  {job}: {error}")
+    if trace_dir:
+        parts = sorted(glob.glob(os.path.join(trace_dir, 'worker*.json')))
+        events = merge_traces(parts, args.trace)
+        print(f"Timing trace of {len(parts)} workers ({events} events) saved to {args.trace}")
+
+
+if __name__ == "__main__":
+    main()
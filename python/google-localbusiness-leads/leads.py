@@ -1,63 +1,65 @@
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import time
-import re
-import random
 import os
-from urllib.parse import urljoin
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from scrapekit.directories import DirectoryCrawler
+from scrapekit.extract import find_emails, find_phones
+from scrapekit.leadstore import LeadStore
+from scrapekit.records import Lead, LeadBatchWriter, leads_to_rows
+
+# The HTTP client, the lookup machinery (asyncio, robots.txt, contact
+# discovery) and pandas are imported where they are first needed so the
+# prompts come up immediately.
+
+# Directories crawled for every industry; see scrapekit.directories for parsers
+GENERAL_DIRECTORIES = ['chamberofcommerce', 'yellowpages', 'manta']
+
+CSV_COLUMNS = ['title', 'url', 'email', 'phone', 'address', 'contact_page', 'source', 'industry', 'location']
 
 class FreelanceLeadScraper:
-    def __init__(self, user_agent=None):
-        """Initialize the scraper with customizable headers."""
-        self.session = requests.Session()
-        self.headers = {
-            'User-Agent': user_agent or 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-        }
-        self.session.headers.update(self.headers)
+    def __init__(self, user_agent=None, max_workers=16, host_delay=(2, 5), max_directory_pages=5):
+        """
+        Initialize the scraper with customizable headers.
+        
+        Websites are fetched by up to max_workers workers in parallel, but each
+        host only sees one request at a time with host_delay seconds (min, max)
+        between them. Each directory is followed for up to max_directory_pages
+        listing pages.
+        """
+        from scrapekit.contact import ContactDiscovery
+        from scrapekit.httpclient import BROWSER_HEADERS, create_session
+        from scrapekit.politeness import PoliteScheduler
+        from scrapekit.robots import RobotsStore
+        
+        self.headers = dict(BROWSER_HEADERS)
+        if user_agent:
+            self.headers['User-Agent'] = user_agent
+        self.session = create_session(workers=max_workers, headers=self.headers)
+        
+        # robots.txt and sitemap contact pages, cached on disk per site
+        self.robots = RobotsStore(self.session)
+        self.scheduler = PoliteScheduler(
+            min_delay=host_delay[0],
+            max_delay=host_delay[1],
+            max_in_flight_per_host=1,
+            max_concurrency=max_workers,
+            robots=self.robots
+        )
+        self.directory_crawler = DirectoryCrawler(self.session, max_pages=max_directory_pages, robots=self.robots)
+        self.contact_discovery = ContactDiscovery(self.session, robots=self.robots)
         self.results = []
         
     def search_direct_urls(self, industry, location=None):
-        """Use a list of direct URLs instead of relying on Google search."""
+        """Pick industry-specific directories to crawl on top of the general ones."""
         print(f"Searching for {industry} businesses in {location if location else 'all locations'}")
         
-        # Industry-specific websites to target
-        if industry.lower() in ['tech', 'software', 'technology', 'development']:
-            urls = [
-                "https://www.builtinnyc.com/companies",
-                "https://www.crunchbase.com/hub/new-york-startups",
-                "https://www.ycombinator.com/companies",
-                "https://angel.co/location/new-york"
-            ]
-        elif industry.lower() in ['marketing', 'digital marketing', 'advertising']:
-            urls = [
-                "https://clutch.co/agencies/digital-marketing",
-                "https://www.digitalagencynetwork.com/agencies/new-york/",
-                "https://agency.webfx.com/digital-marketing-agency-new-york-ny"
-            ]
-        else:
-            # Default list for any industry
-            urls = [
-                "https://www.chamber-of-commerce.com/",
-                "https://www.yelp.com/search?find_desc=" + industry.replace(' ', '+'),
-                "https://www.linkedin.com/company-beta/"
-            ]
-            
-        leads = []
-        for url in urls:
-            try:
-                print(f"Trying to scrape directory: {url}")
-                lead = {
-                    'title': f"{industry} leads from {url.split('/')[2]}",
-                    'url': url
-                }
-                leads.append(lead)
-            except Exception as e:
-                print(f"Error adding directory {url}: {e}")
-                
-        return leads
+        # Industry-specific directories to target
+        if industry.lower() in ['tech', 'software', 'technology', 'development',
+                                'web development', 'custom software']:
+            return ['clutch']
+        elif industry.lower() in ['marketing', 'digital marketing', 'advertising', 'seo']:
+            return ['clutch']
+        return []
         
     def scrape_linkedin_companies(self, industry, location=None):
         """Scrape LinkedIn for company details - note this is a simplified version."""
@@ -65,33 +67,17 @@ class FreelanceLeadScraper:
         print("This is a placeholder for that functionality.")
         return []
     
-    def scan_business_directories(self, industry, location=None):
-        """Use business directories to find leads."""
-        business_directories = [
-            "https://www.chamberofcommerce.com/",
-            "https://www.yellowpages.com/",
-            "https://www.yelp.com/",
-            "https://www.manta.com/"
-        ]
-        
-        leads = []
-        for directory in business_directories:
-            try:
-                search_term = f"{industry} {location}" if location else industry
-                search_url = f"{directory}search?q={search_term.replace(' ', '+')}"
-                print(f"Would search: {search_url}")
-                
-                # In a full implementation, we'd scrape the directory here
-                # This is simplified for demonstration
-                lead = {
-                    'title': f"{industry} leads from {directory.split('/')[2]}",
-                    'url': search_url
-                }
-                leads.append(lead)
-            except Exception as e:
-                print(f"Error searching directory {directory}: {e}")
-                
-        return leads
+    def scan_business_directories(self, industry, location=None, directories=None):
+        """
+        Use business directories to find leads.
+        
+        This is a generator: company websites are yielded as soon as each
+        directory listing page is parsed, while pagination continues in the
+        background.
+        """
+        business_directories = list(GENERAL_DIRECTORIES) + list(directories or [])
+        print(f"Crawling directories: {', '.join(business_directories)}")
+        return self.directory_crawler.iter_leads(business_directories, industry, location)
     
     def scrape_website(self, url):
         """Scrape a website for contact information."""
@@ -99,6 +85,7 @@ class FreelanceLeadScraper:
             'url': url,
             'email': None,
             'phone': None,
+            'address': None,
             'contact_page': None
         }
         
@@ -108,51 +95,23 @@ class FreelanceLeadScraper:
             
             if response.status_code == 200:
                 print(f"Successfully accessed {url}")
-                soup = BeautifulSoup(response.text, 'html.parser')
+                page = response.text
                 
                 # Extract email addresses
-                emails = re.findall(r'[\w.+-]+@[\w-]+\.[\w.-]+', response.text)
+                emails = find_emails(page)
                 if emails:
                     contact_info['email'] = emails[0]  # Take the first email found
                     print(f"Found email: {contact_info['email']}")
                 
                 # Extract phone numbers
-                phone_pattern = re.compile(r'(\+\d{1,3}[-.\s]?)?(\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})')
-                phones = phone_pattern.findall(response.text)
+                phones = find_phones(page)
                 if phones:
-                    contact_info['phone'] = ''.join(phones[0]).strip()
+                    contact_info['phone'] = phones[0]
                     print(f"Found phone: {contact_info['phone']}")
                 
-                # Find contact page
-                contact_links = soup.find_all('a', string=re.compile(r'contact', re.I))
-                if not contact_links:
-                    contact_links = soup.find_all('a', href=re.compile(r'contact', re.I))
-                
-                if contact_links:
-                    contact_href = contact_links[0].get('href')
-                    if contact_href:
-                        contact_info['contact_page'] = urljoin(url, contact_href)
-                        print(f"Found contact page: {contact_info['contact_page']}")
-                
-                # If a contact page was found, scrape it as well
-                if contact_info['contact_page'] and contact_info['contact_page'] != url:
-                    try:
-                        contact_response = self.session.get(contact_info['contact_page'], timeout=15)
-                        if contact_response.status_code == 200:
-                            print(f"Successfully accessed contact page: {contact_info['contact_page']}")
-                            # Look for emails on the contact page
-                            contact_emails = re.findall(r'[\w.+-]+@[\w-]+\.[\w.-]+', contact_response.text)
-                            if contact_emails and not contact_info['email']:
-                                contact_info['email'] = contact_emails[0]
-                                print(f"Found email on contact page: {contact_info['email']}")
-                            
-                            # Look for phone numbers on the contact page
-                            contact_phones = phone_pattern.findall(contact_response.text)
-                            if contact_phones and not contact_info['phone']:
-                                contact_info['phone'] = ''.join(contact_phones[0]).strip()
-                                print(f"Found phone on contact page: {contact_info['phone']}")
-                    except Exception as e:
-                        print(f"Error scraping contact page: {e}")
+                # Fetch the best ranked contact/about/imprint pages until
+                # both an email and a phone number have been found
+                contact_info = self.contact_discovery.discover(url, page, contact_info)
             else:
                 print(f"Failed to access {url} - Status code: {response.status_code}")
                 
@@ -161,42 +120,49 @@ class FreelanceLeadScraper:
         
         return contact_info
     
+    def _process_lead(self, lead, industry, location):
+        """Scrape one directory lead and return its lead record."""
+        print(f"Processing lead: {lead['title']} - {lead['url']}")
+        contact_info = self.scrape_website(lead['url'])
+        
+        return Lead(
+            title=lead['title'],
+            url=lead['url'],
+            email=contact_info['email'],
+            phone=contact_info['phone'],
+            address=contact_info['address'],
+            contact_page=contact_info['contact_page'],
+            source=lead.get('source'),
+            industry=industry,
+            location=location
+        )
+    
     def find_leads(self, industry, location=None):
         """Find leads based on industry and location."""
-        all_leads = []
-        
-        # Get leads from multiple sources
-        directory_leads = self.scan_business_directories(industry, location)
-        direct_leads = self.search_direct_urls(industry, location)
+        # Stream company websites from the directories straight into scraping
+        directories = self.search_direct_urls(industry, location)
+        leads = self.scan_business_directories(industry, location, directories)
         
-        # Combine all lead sources
-        leads = directory_leads + direct_leads
+        # Unrelated hosts are fetched in parallel; each host is rate limited
+        all_leads = self.scheduler.run(
+            (lead['url'], self._process_lead, (lead, industry, location)) for lead in leads
+        )
+        all_leads = [lead_info for lead_info in all_leads if lead_info]
+        self.robots.save()
         
-        for lead in leads:
-            print(f"Processing lead: {lead['title']} - {lead['url']}")
-            contact_info = self.scrape_website(lead['url'])
-            
-            lead_info = {
-                'title': lead['title'],
-                'url': lead['url'],
-                'email': contact_info['email'],
-                'phone': contact_info['phone'],
-                'contact_page': contact_info['contact_page'],
-                'industry': industry,
-                'location': location
-            }
-            
-            all_leads.append(lead_info)
-            # Be respectful with rate limiting
-            time.sleep(random.uniform(2, 5))
+        print("\nRequests per host:")
+        print(self.session.stats.report())
+        print(self.contact_discovery.report())
         
         self.results = all_leads
         return all_leads
     
     def save_to_csv(self, filename='freelance_leads.csv'):
         """Save the results to a CSV file."""
+        import pandas as pd
+        
         if self.results:
-            df = pd.DataFrame(self.results)
+            df = pd.DataFrame(leads_to_rows(self.results, CSV_COLUMNS), columns=CSV_COLUMNS)
             df.to_csv(filename, index=False)
             print(f"Saved {len(self.results)} leads to {filename}")
             
@@ -206,28 +172,45 @@ class FreelanceLeadScraper:
         else:
             print("No leads to save. Creating empty CSV file for structure.")
             # Create empty DataFrame with the right columns
-            columns = ['title', 'url', 'email', 'phone', 'contact_page', 'industry', 'location']
-            df = pd.DataFrame(columns=columns)
+            df = pd.DataFrame(columns=CSV_COLUMNS)
             df.to_csv(filename, index=False)
             print(f"Created empty leads file: {filename}")
+    
+    def save_to_parquet(self, filename='freelance_leads.parquet'):
+        """Write the results to Parquet (or Arrow IPC for .arrow) in record batches."""
+        with LeadBatchWriter(filename, columns=CSV_COLUMNS) as writer:
+            writer.write_all(self.results)
+        print(f"Saved {writer.written} leads to {filename}")
+    
+    def save_to_store(self, db_path='leads.db'):
+        """Merge the results into the shared SQLite lead store."""
+        with LeadStore(db_path) as store:
+            inserted, updated = store.merge(self.results)
+            total = len(store)
+        print(f"Merged into {db_path}: {inserted} new, {updated} updated, {total} leads in store")
 
 # Example usage
 if __name__ == "__main__":
     try:
-        scraper = FreelanceLeadScraper()
-        
         # Define your industry focus
         industry = input("Enter your industry focus (e.g., web development, data analysis): ") or "web development"
         
         # Add your location to target local businesses
         location = input("Enter your target location (e.g., New York, Chicago): ") or "New York"
         
+        write_parquet = input("Also save results as Parquet? (y/n, default: n): ").lower() == 'y'
+        
+        scraper = FreelanceLeadScraper()
+        
         # Find leads
         print(f"Starting lead generation for {industry} in {location}...")
         leads = scraper.find_leads(industry, location)
         
         # Save results
         scraper.save_to_csv()
+        if write_parquet:
+            scraper.save_to_parquet()
+        scraper.save_to_store()
         
         print("\n===== LEAD GENERATION COMPLETE =====")
         print(f"Total leads found: {len(scraper.results)}")
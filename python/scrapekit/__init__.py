@@ -0,0 +1 @@
+"""Shared helpers for the lead generation scrapers in this repository."""
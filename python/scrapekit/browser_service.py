@@ -0,0 +1,459 @@
+"""
+Long-lived browser service.
+
+Starting Chrome costs several seconds per scraper run and every run starts
+with a cold cache. The daemon in this module keeps a pool of warm Chrome
+instances with remote debugging enabled; scrapers lease one, attach to it
+with chromedriver and hand it back when they quit.
+
+Start the daemon once:
+
+    python -m scrapekit.browser_service --browsers 3 --port 9300
+
+and point the scrapers at it:
+
+    SCRAPEKIT_BROWSER_SERVICE=127.0.0.1:9300 python google-crawls/main.py
+
+When SCRAPEKIT_BROWSER_SERVICE is not set, scrapers launch their own Chrome
+as before.
+
+A lease that is neither renewed nor released within --lease-timeout seconds
+is reclaimed; leased drivers renew theirs in the background until quit().
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scrapekit.chrome import SERVICE_ENV_VAR
+from scrapekit.profiles import ProfileStore
+
+CHROME_CANDIDATES = [
+    'google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome',
+    r'C:\Program Files\Google\Chrome\Application\chrome.exe',
+    r'C:\Program Files (x86)\Google\Chrome\Application\chrome.exe',
+    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+]
+
+
+def find_chrome_binary():
+    """Return the Chrome executable, honouring the CHROME_BINARY environment variable."""
+    candidates = [os.getenv('CHROME_BINARY')] + CHROME_CANDIDATES
+    for candidate in candidates:
+        if not candidate:
+            continue
+        path = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+        if path:
+            return path
+    raise FileNotFoundError("Could not find Chrome; set CHROME_BINARY to its path")
+
+
+class ChromeInstance:
+    """One Chrome process with remote debugging enabled."""
+
+    def __init__(self, port, headless=True, extra_args=None, user_data_dir=None):
+        self.port = port
+        self.headless = headless
+        self.extra_args = extra_args or []
+        self.user_data_dir = user_data_dir
+        self.persistent_profile = user_data_dir is not None
+        self.process = None
+        self.lease_id = None
+        self.leased_at = None
+
+    @property
+    def debugger_address(self):
+        return f"127.0.0.1:{self.port}"
+
+    def start(self, startup_timeout=30):
+        """Launch Chrome and wait until its DevTools endpoint answers."""
+        if self.user_data_dir is None:
+            self.user_data_dir = tempfile.mkdtemp(prefix=f"scrapekit-chrome-{self.port}-")
+        args = [
+            find_chrome_binary(),
+            f"--remote-debugging-port={self.port}",
+            f"--user-data-dir={self.user_data_dir}",
+            f"--disk-cache-dir={os.path.join(self.user_data_dir, 'DiskCache')}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--no-sandbox",
+            "--disable-dev-shm-usage",
+            "--disable-blink-features=AutomationControlled",
+            "--window-size=1920,1080",
+        ]
+        if self.headless:
+            args.append("--headless=new")
+        args.extend(self.extra_args)
+        args.append("about:blank")
+
+        self.process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        deadline = time.time() + startup_timeout
+        while time.time() < deadline:
+            if self.is_ready():
+                return
+            if self.process.poll() is not None:
+                break
+            time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f"Chrome on port {self.port} did not start")
+
+    def is_ready(self):
+        try:
+            with urllib.request.urlopen(f"http://{self.debugger_address}/json/version", timeout=1):
+                return True
+        except (urllib.error.URLError, OSError):
+            return False
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+
+
+class BrowserPool:
+    """Thread-safe pool of warm Chrome instances handed out as leases."""
+
+    def __init__(self, size=2, max_size=None, base_port=9222, headless=True,
+                 extra_args=None, lease_timeout=3600, profile_store=None):
+        self.size = size
+        self.profile_store = profile_store
+        self.max_size = max_size or size
+        self.base_port = base_port
+        self.headless = headless
+        self.extra_args = extra_args or []
+        self.lease_timeout = lease_timeout
+        self.instances = []
+        self.lock = threading.Lock()
+
+    def warm_up(self):
+        """Start the initial set of browsers."""
+        for _ in range(self.size):
+            with self.lock:
+                instance = self._reserve()
+            self._start(instance, is_new=True)
+            with self.lock:
+                instance.lease_id = None
+                instance.leased_at = None
+        print(f"Browser pool ready with {len(self.instances)} Chrome instances")
+
+    def _reserve(self):
+        """Add a not yet started instance on a free port; it is marked leased so nobody else takes it."""
+        used_ports = {instance.port for instance in self.instances}
+        port = next(p for p in range(self.base_port, self.base_port + 1000) if p not in used_ports)
+        user_data_dir = None
+        if self.profile_store:
+            user_data_dir = self.profile_store.profile_dir('browser-service', port)
+        instance = ChromeInstance(port, self.headless, self.extra_args, user_data_dir)
+        self.instances.append(instance)
+        self._assign(instance)
+        return instance
+
+    def _start(self, instance, is_new):
+        """Start Chrome without holding the pool lock; a failed start gives the slot back."""
+        try:
+            instance.start()
+        except Exception:
+            with self.lock:
+                if is_new:
+                    self.instances.remove(instance)
+                else:
+                    instance.lease_id = None
+                    instance.leased_at = None
+            raise
+
+    def lease(self):
+        """Lease a free browser, starting a new one if under max_size. Returns None if all are busy."""
+        with self.lock:
+            self._reclaim_expired()
+            instance = next((instance for instance in self.instances if instance.lease_id is None), None)
+            is_new = instance is None
+            if is_new:
+                if len(self.instances) >= self.max_size:
+                    return None
+                instance = self._reserve()
+            else:
+                self._assign(instance)
+            lease = self._lease_info(instance)
+            needs_start = not instance.is_alive()
+
+        # Chrome can take many seconds to start; release and status are not blocked meanwhile
+        if needs_start:
+            if not is_new:
+                print(f"Restarting dead Chrome on port {instance.port}")
+            self._start(instance, is_new)
+        return lease
+
+    def _assign(self, instance):
+        instance.lease_id = uuid.uuid4().hex
+        instance.leased_at = time.time()
+
+    def _lease_info(self, instance):
+        return {
+            'lease_id': instance.lease_id,
+            'debugger_address': instance.debugger_address,
+            'lease_timeout': self.lease_timeout,
+        }
+
+    def renew(self, lease_id):
+        """Extend a lease by another lease_timeout; False if it is unknown or was reclaimed."""
+        with self.lock:
+            for instance in self.instances:
+                if lease_id and instance.lease_id == lease_id:
+                    instance.leased_at = time.time()
+                    return True
+        return False
+
+    def release(self, lease_id):
+        """Return a leased browser to the pool."""
+        with self.lock:
+            for instance in self.instances:
+                if lease_id and instance.lease_id == lease_id:
+                    instance.lease_id = None
+                    instance.leased_at = None
+                    return True
+        return False
+
+    def _reclaim_expired(self):
+        now = time.time()
+        for instance in self.instances:
+            if instance.lease_id and now - instance.leased_at > self.lease_timeout:
+                print(f"Reclaiming expired lease on port {instance.port}")
+                instance.lease_id = None
+                instance.leased_at = None
+
+    def status(self):
+        with self.lock:
+            return {
+                'browsers': len(self.instances),
+                'leased': sum(1 for instance in self.instances if instance.lease_id),
+                'max_size': self.max_size,
+            }
+
+    def shutdown(self):
+        with self.lock:
+            for instance in self.instances:
+                instance.stop()
+                if instance.user_data_dir and not instance.persistent_profile:
+                    shutil.rmtree(instance.user_data_dir, ignore_errors=True)
+            self.instances = []
+
+
+def _make_handler(pool):
+    class BrowserServiceHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_json(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            return json.loads(self.rfile.read(length) or b'{}')
+
+        def do_GET(self):
+            if self.path == '/status':
+                self._send_json(200, pool.status())
+            else:
+                self._send_json(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path == '/lease':
+                try:
+                    lease = pool.lease()
+                except Exception as e:
+                    self._send_json(500, {'error': str(e)})
+                    return
+                if lease:
+                    self._send_json(200, lease)
+                else:
+                    self._send_json(503, {'error': 'all browsers are leased'})
+            elif self.path == '/release':
+                released = pool.release(self._read_json().get('lease_id'))
+                self._send_json(200 if released else 404, {'released': released})
+            elif self.path == '/renew':
+                renewed = pool.renew(self._read_json().get('lease_id'))
+                self._send_json(200 if renewed else 404, {'renewed': renewed})
+            else:
+                self._send_json(404, {'error': 'not found'})
+
+        def log_message(self, format, *args):
+            pass
+
+    return BrowserServiceHandler
+
+
+class BrowserServiceClient:
+    """Client used by the scrapers to lease and return browsers from the daemon."""
+
+    def __init__(self, address=None, timeout=120):
+        self.address = address or os.getenv(SERVICE_ENV_VAR)
+        self.timeout = timeout
+
+    def _post(self, path, payload=None):
+        request = urllib.request.Request(
+            f"http://{self.address}{path}",
+            data=json.dumps(payload or {}).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return json.loads(response.read())
+
+    def lease(self):
+        """Lease a browser, waiting while all of them are busy. Returns {'lease_id', 'debugger_address'}."""
+        deadline = time.time() + self.timeout
+        while True:
+            try:
+                return self._post('/lease')
+            except urllib.error.HTTPError as e:
+                if e.code != 503 or time.time() > deadline:
+                    raise
+            time.sleep(1)
+
+    def release(self, lease_id):
+        try:
+            self._post('/release', {'lease_id': lease_id})
+        except (urllib.error.URLError, OSError) as e:
+            print(f"Could not release browser lease {lease_id}: {e}")
+
+    def renew(self, lease_id):
+        """Keep a lease from being reclaimed. Returns False if the daemon no longer knows it."""
+        try:
+            self._post('/renew', {'lease_id': lease_id})
+            return True
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return False
+            print(f"Could not renew browser lease {lease_id}: {e}")
+        except (urllib.error.URLError, OSError) as e:
+            print(f"Could not renew browser lease {lease_id}: {e}")
+        return True
+
+    def keep_alive(self, lease):
+        """Renew the lease in the background until the returned event is set."""
+        stopped = threading.Event()
+        interval = max(1, lease.get('lease_timeout', 3600) / 3)
+
+        def renew_until_stopped():
+            while not stopped.wait(interval):
+                if not self.renew(lease['lease_id']):
+                    print(f"Browser lease {lease['lease_id']} was reclaimed by the service")
+                    return
+
+        threading.Thread(target=renew_until_stopped, daemon=True).start()
+        return stopped
+
+
+def attach_leased_driver(chromedriver_path=None, client=None):
+    """
+    Lease a warm browser and return a WebDriver attached to it.
+
+    quit() on the returned driver closes extra tabs, ends the chromedriver
+    session and returns the browser to the pool instead of killing Chrome.
+    Until then the lease is renewed in the background, however long the
+    driver is used.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
+    client = client or BrowserServiceClient()
+    lease = client.lease()
+
+    # Launch flags belong to the daemon; only the debugger address applies here
+    attach_options = Options()
+    attach_options.add_experimental_option("debuggerAddress", lease['debugger_address'])
+    service = Service(chromedriver_path) if chromedriver_path else Service()
+    try:
+        driver = webdriver.Chrome(service=service, options=attach_options)
+    except Exception:
+        client.release(lease['lease_id'])
+        raise
+    renewing = client.keep_alive(lease)
+
+    end_session = driver.quit
+
+    def quit():
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.get("about:blank")
+        except Exception:
+            pass
+        finally:
+            renewing.set()
+            try:
+                end_session()
+            finally:
+                client.release(lease['lease_id'])
+
+    driver.quit = quit
+    driver.lease_id = lease['lease_id']
+    return driver
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep warm Chrome instances for the scrapers to lease")
+    parser.add_argument("--port", type=int, default=9300, help="Port of the lease API (default: 9300)")
+    parser.add_argument("--browsers", type=int, default=2, help="Browsers started up front (default: 2)")
+    parser.add_argument("--max-browsers", type=int, default=None, help="Upper bound when all browsers are leased (default: --browsers)")
+    parser.add_argument("--debug-port", type=int, default=9222, help="First Chrome remote debugging port (default: 9222)")
+    parser.add_argument("--headed", action="store_true", help="Show browser windows instead of running headless")
+    parser.add_argument("--lease-timeout", type=int, default=3600, help="Seconds without a renewal before a lease is reclaimed (default: 3600)")
+    parser.add_argument("--chrome-arg", action="append", default=[], help="Extra Chrome command-line flag (repeatable)")
+    parser.add_argument("--profile-dir", default=None, help="Keep browser profiles and disk caches here between restarts")
+    parser.add_argument("--profile-cap-mb", type=int, default=2048, help="Size cap for --profile-dir (default: 2048)")
+    args = parser.parse_args()
+
+    profile_store = None
+    if args.profile_dir:
+        profile_store = ProfileStore(args.profile_dir, max_size_mb=args.profile_cap_mb)
+        profile_store.cleanup()
+
+    pool = BrowserPool(
+        size=args.browsers,
+        max_size=args.max_browsers,
+        base_port=args.debug_port,
+        headless=not args.headed,
+        extra_args=args.chrome_arg,
+        lease_timeout=args.lease_timeout,
+        profile_store=profile_store
+    )
+    pool.warm_up()
+
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), _make_handler(pool))
+    print(f"Browser service listening on 127.0.0.1:{args.port}")
+    print(f"Set {SERVICE_ENV_VAR}=127.0.0.1:{args.port} for scrapers to use it")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down browser service...")
+    finally:
+        server.server_close()
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+import os
+import time
+
+# Address of the browser service to lease warm browsers from. The service
+# module (http.server, urllib.request) is only imported when this is set.
+SERVICE_ENV_VAR = 'SCRAPEKIT_BROWSER_SERVICE'
+
+# Where the resolved chromedriver path is remembered between runs. The path is
+# re-resolved after CHROMEDRIVER_CACHE_TTL so Chrome upgrades are picked up.
+CHROMEDRIVER_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'scrapekit', 'chromedriver_path')
+CHROMEDRIVER_CACHE_TTL = 24 * 60 * 60
+
+_chromedriver_path = None
+
+
+def chromedriver_path():
+    """
+    Return the path of a chromedriver binary matching the installed Chrome.
+
+    Resolution order: the CHROMEDRIVER_PATH environment variable, the path
+    cached on disk by a previous run, then webdriver_manager (which may hit
+    the network). The result is cached for the rest of the process.
+    """
+    global _chromedriver_path
+    if _chromedriver_path:
+        return _chromedriver_path
+
+    path = os.getenv('CHROMEDRIVER_PATH')
+    if not path:
+        path = _read_cached_path()
+    if not path:
+        from webdriver_manager.chrome import ChromeDriverManager
+        path = ChromeDriverManager().install()
+        _write_cached_path(path)
+
+    _chromedriver_path = path
+    return path
+
+
+def _read_cached_path():
+    try:
+        if time.time() - os.path.getmtime(CHROMEDRIVER_CACHE_FILE) > CHROMEDRIVER_CACHE_TTL:
+            return None
+        with open(CHROMEDRIVER_CACHE_FILE, 'r', encoding='utf-8') as f:
+            path = f.read().strip()
+    except OSError:
+        return None
+    return path if path and os.path.exists(path) else None
+
+
+def _write_cached_path(path):
+    try:
+        os.makedirs(os.path.dirname(CHROMEDRIVER_CACHE_FILE), exist_ok=True)
+        with open(CHROMEDRIVER_CACHE_FILE, 'w', encoding='utf-8') as f:
+            f.write(path)
+    except OSError as e:
+        print(f"Could not cache chromedriver path: {e}")
+
+
+def new_chrome_driver(options, manage_driver=True):
+    """
+    Return a Chrome WebDriver with the given options.
+
+    If SCRAPEKIT_BROWSER_SERVICE is set, a warm browser is leased from the
+    browser service instead of launching Chrome. With manage_driver=False
+    chromedriver is located by Selenium itself rather than webdriver_manager.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    path = chromedriver_path() if manage_driver else None
+
+    if os.getenv(SERVICE_ENV_VAR):
+        from scrapekit.browser_service import attach_leased_driver
+        return attach_leased_driver(path)
+
+    service = Service(path) if path else Service()
+    return webdriver.Chrome(service=service, options=options)
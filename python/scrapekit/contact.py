@@ -0,0 +1,263 @@
+"""
+Contact page discovery.
+
+Rather than following the first link that mentions "contact" (which may be
+off-site or a blog post), candidate pages are ranked by URL and link text,
+the best few are fetched concurrently, and no further candidates are fetched
+once an email and a phone number have been found. When a RobotsStore is
+given, contact pages listed in the site's sitemap are used instead of
+homepage links, disallowed URLs are skipped, and candidates are fetched one
+at a time, page_delay seconds (or the Crawl-delay) apart. Homepage structured data
+(JSON-LD, microdata) is checked first and, when it declares both, no
+contact page is fetched at all.
+"""
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urljoin, urlparse
+
+from scrapekit.domains import registered_domain
+from scrapekit.extract import extract_anchors, find_phones, plausible_emails
+from scrapekit.structured import extract_structured_contact
+
+# Keyword weights, matched against both the link's path and its text
+CANDIDATE_KEYWORDS = [
+    ('contact', 10),
+    ('kontakt', 10),
+    ('impressum', 9),
+    ('imprint', 8),
+    ('about', 5),
+    ('location', 3),
+    ('team', 2),
+    ('company', 2),
+]
+
+# Pages that mention "contact" but are rarely the contact page itself
+SKIP_PATHS = re.compile(r'/(blog|news|posts?|articles?|tags?|category|press)/|/\d{4}/\d{2}/', re.I)
+
+# Tried when the homepage links to nothing that looks like a contact page
+GUESSED_PATHS = ['/contact', '/contact-us', '/about']
+
+
+def rank_contact_candidates(html, page_url, limit=4, anchors=None):
+    """
+    Return up to `limit` on-site URLs most likely to hold contact details,
+    best first. Pass the page's extract_anchors() result to avoid parsing it again.
+    """
+    if anchors is None:
+        anchors = extract_anchors(html)
+    footer_start = len(anchors) * 0.8
+    home = page_url.split('#')[0].rstrip('/')
+    domain = registered_domain(page_url)
+
+    scores = {}
+    for index, (href, text) in enumerate(anchors):
+        if not href:
+            continue
+        url = urljoin(page_url, href).split('#')[0]
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or url.rstrip('/') == home:
+            continue
+        if registered_domain(url) != domain or SKIP_PATHS.search(parsed.path):
+            continue
+
+        path = parsed.path.lower()
+        text = text.lower()
+        score = sum(weight for keyword, weight in CANDIDATE_KEYWORDS if keyword in path)
+        score += sum(weight for keyword, weight in CANDIDATE_KEYWORDS if keyword in text)
+        if not score:
+            continue
+        if index >= footer_start:
+            # Footer links are usually the site-wide contact/imprint links
+            score += 1
+        scores[url] = max(scores.get(url, 0), score)
+
+    if not any(score >= 8 for score in scores.values()):
+        root = f"{urlparse(page_url).scheme}://{urlparse(page_url).netloc}"
+        for path in GUESSED_PATHS:
+            scores.setdefault(root + path, 1)
+
+    return sorted(scores, key=scores.get, reverse=True)[:limit]
+
+
+def linked_urls(anchors, page_url):
+    """Absolute URLs (without fragments) of every link in an extract_anchors() result."""
+    return {urljoin(page_url, href).split('#')[0] for href, _ in anchors if href}
+
+
+def rank_sitemap_urls(urls):
+    """Order sitemap URLs by how likely they are to be the contact page."""
+    def score(url):
+        path = urlparse(url).path.lower()
+        return sum(weight for keyword, weight in CANDIDATE_KEYWORDS if keyword in path)
+    return sorted(urls, key=score, reverse=True)
+
+
+def has_contact_details(contact_info):
+    return bool(contact_info['email'] and contact_info['phone'])
+
+
+class ContactDiscovery:
+    """Fetch ranked contact page candidates in parallel and stop early."""
+
+    def __init__(self, session, max_candidates=4, max_parallel=2, timeout=15, robots=None, page_delay=1.0):
+        self.session = session
+        self.robots = robots
+        self.max_candidates = max_candidates
+        self.max_parallel = max_parallel
+        self.timeout = timeout
+        self.page_delay = page_delay
+        self.stats_lock = threading.Lock()
+        self.stats = {
+            'pages': 0, 'structured_hits': 0, 'fetches_saved': 0,
+            'candidate_fetches': 0, 'sitemap_hits': 0, 'disallowed': 0,
+        }
+
+    def _count(self, key, amount=1):
+        with self.stats_lock:
+            self.stats[key] += amount
+
+    def report(self):
+        """One-line summary of how much work structured data and early stopping saved."""
+        return (
+            f"Contact discovery: {self.stats['pages']} sites, "
+            f"{self.stats['structured_hits']} answered by structured data, "
+            f"{self.stats['sitemap_hits']} with contact pages from the sitemap, "
+            f"{self.stats['disallowed']} candidates skipped by robots.txt, "
+            f"{self.stats['candidate_fetches']} contact page fetches, "
+            f"{self.stats['fetches_saved']} fetches saved by structured data"
+        )
+
+    def _apply_structured_data(self, html, contact_info):
+        """Prefer schema.org JSON-LD/microdata over regex matches; returns True if it completed the details."""
+        structured = extract_structured_contact(html)
+        had_details = has_contact_details(contact_info)
+        for key in ('email', 'phone', 'address'):
+            if structured[key]:
+                contact_info[key] = structured[key]
+        if structured['confident']:
+            self._count('structured_hits')
+            print(f"Found contact details in structured data: {structured['email']}, {structured['phone']}")
+        return not had_details and has_contact_details(contact_info)
+
+    def _fetch(self, url, delay=0):
+        if delay:
+            time.sleep(delay)
+        self._count('candidate_fetches')
+        response = self.session.get(url, timeout=self.timeout)
+        if response.status_code != 200:
+            return None
+        return response.text
+
+    def _candidates(self, page_url, html, anchors):
+        """Contact pages listed in the sitemap if there are any, else ranked homepage links."""
+        if not self.robots:
+            return rank_contact_candidates(html, page_url, self.max_candidates, anchors)
+
+        candidates = rank_sitemap_urls(self.robots.contact_urls(page_url))[:self.max_candidates]
+        if candidates:
+            self._count('sitemap_hits')
+            return candidates
+
+        allowed = []
+        for url in rank_contact_candidates(html, page_url, self.max_candidates, anchors):
+            if self.robots.can_fetch(url):
+                allowed.append(url)
+            else:
+                self._count('disallowed')
+        return allowed
+
+    def discover(self, page_url, html, contact_info):
+        """
+        Fill in the missing email/phone of contact_info and return it.
+
+        Structured data on the homepage is used first; if it (with what was
+        already found) gives both an email and a phone, nothing else is
+        fetched: no robots.txt, sitemap or candidate page. contact_page is set to the page that supplied details,
+        else to the best candidate that was fetched successfully or that the
+        homepage actually links to; guessed or failing URLs are never stored.
+        """
+        self._count('pages')
+        completed_by_structured_data = self._apply_structured_data(html, contact_info)
+        # The homepage's links are parsed once for ranking and link checks
+        anchors = extract_anchors(html)
+
+        # Complete already (e.g. confident structured data): skip robots.txt,
+        # sitemaps and candidate pages, and only pick a contact page from the links
+        if has_contact_details(contact_info):
+            if completed_by_structured_data:
+                self._count('fetches_saved')
+            contact_info['contact_page'] = contact_info['contact_page'] or self._linked_candidate(
+                page_url, anchors, rank_contact_candidates(html, page_url, self.max_candidates, anchors))
+            return contact_info
+
+        candidates = self._candidates(page_url, html, anchors)
+        if not candidates:
+            return contact_info
+
+        # With robots.txt rules the site gets one request at a time, spaced
+        # by page_delay or its Crawl-delay, counting from the homepage fetch
+        if self.robots:
+            parallel, delay = 1, max(self.page_delay, self.robots.crawl_delay(page_url))
+        else:
+            parallel, delay = self.max_parallel, 0
+
+        found_on = None
+        fetched = []
+        failed = set()
+        queued = iter(candidates)
+        executor = ThreadPoolExecutor(max_workers=parallel)
+        try:
+            # Keep `parallel` fetches in flight; the next candidate is only
+            # started if details are still missing when one finishes
+            pending = {}
+            for url in queued:
+                pending[executor.submit(self._fetch, url, delay)] = url
+                if len(pending) >= parallel:
+                    break
+            while pending and not has_contact_details(contact_info):
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = pending.pop(future)
+                    try:
+                        page = future.result()
+                    except Exception as e:
+                        print(f"Error fetching candidate {url}: {e}")
+                        page = None
+                    if not page:
+                        failed.add(url)
+                    else:
+                        fetched.append(url)
+                        emails = plausible_emails(page)
+                        phones = find_phones(page)
+                        if emails and not contact_info['email']:
+                            contact_info['email'] = emails[0]
+                            found_on = found_on or url
+                            print(f"Found email on {url}: {contact_info['email']}")
+                        if phones and not contact_info['phone']:
+                            contact_info['phone'] = phones[0]
+                            found_on = found_on or url
+                            print(f"Found phone on {url}: {contact_info['phone']}")
+                    if not has_contact_details(contact_info):
+                        next_url = next(queued, None)
+                        if next_url:
+                            pending[executor.submit(self._fetch, next_url, delay)] = next_url
+        finally:
+            # Fetches still in flight after an early stop are left to finish
+            # in the background and their results ignored
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        fetched.sort(key=candidates.index)
+        contact_info['contact_page'] = (
+            found_on or contact_info['contact_page']
+            or (fetched[0] if fetched else self._linked_candidate(
+                page_url, anchors, [url for url in candidates if url not in failed]))
+        )
+        return contact_info
+
+    @staticmethod
+    def _linked_candidate(page_url, anchors, candidates):
+        """The best candidate the page really links to, or None."""
+        links = linked_urls(anchors, page_url)
+        return next((url for url in candidates if url in links), None)
@@ -0,0 +1,203 @@
+"""
+Fuzzy duplicate detection across lead sets.
+
+The same business shows up under different titles and URLs from Maps, Yelp,
+Google and the directories. Comparing every pair is out of the question for
+100k+ leads, so candidates are blocked first: leads sharing a place ID,
+normalized phone number or domain are merged outright, and leads sharing a
+reasonably rare name token are scored against each other in one batch per
+block with rapidfuzz (difflib is used when rapidfuzz/numpy are not
+installed). Matches are joined with union-find and each cluster becomes one
+merged Lead. Two Maps places with different place IDs are never merged:
+branches of a chain share a website and often a phone number.
+
+    python -m scrapekit.dedup --db leads.db --out deduped_leads.csv
+"""
+import argparse
+import csv
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+from scrapekit.domains import lead_domain_key
+from scrapekit.records import FIELDS, Lead, leads_to_rows, normalize_phone
+
+# Words that say nothing about which business a name refers to
+NAME_STOPWORDS = {
+    'the', 'and', 'of', 'llc', 'inc', 'ltd', 'co', 'corp', 'corporation',
+    'company', 'group', 'services', 'service', 'pllc', 'pc', 'llp', 'plc',
+}
+NAME_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Tokens shared by more leads than this ("pizza", "dental") are too common to block on
+MAX_BLOCK_SIZE = 200
+
+
+def normalize_name(name):
+    tokens = NAME_TOKEN_PATTERN.findall((name or '').lower())
+    return ' '.join(token for token in tokens if token not in NAME_STOPWORDS)
+
+
+class _UnionFind:
+    """Union-find that keeps the set of place IDs, phones and domains of every cluster on its root."""
+
+    def __init__(self, place_ids, phones, domains):
+        self.parent = list(range(len(phones)))
+        self.place_ids = [{place_id} if place_id else set() for place_id in place_ids]
+        self.phones = [{phone} if phone else set() for phone in phones]
+        self.domains = [{domain} if domain else set() for domain in domains]
+
+    def find(self, item):
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def conflicting(self, a, b):
+        """True if the clusters of a and b both have place IDs, phones or domains, and share none."""
+        root_a, root_b = self.find(a), self.find(b)
+        return any(
+            keys[root_a] and keys[root_b] and keys[root_a].isdisjoint(keys[root_b])
+            for keys in (self.place_ids, self.phones, self.domains)
+        )
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            root, child = min(root_a, root_b), max(root_a, root_b)
+            self.parent[child] = root
+            self.place_ids[root] |= self.place_ids[child]
+            self.phones[root] |= self.phones[child]
+            self.domains[root] |= self.domains[child]
+            self.place_ids[child] = self.phones[child] = self.domains[child] = None
+
+    def join(self, a, b):
+        """Union a and b unless their clusters conflict."""
+        if self.find(a) != self.find(b) and not self.conflicting(a, b):
+            self.union(a, b)
+
+
+def _similar_pairs(names, threshold):
+    """Yield (i, j) index pairs within one block whose names score at least threshold (0-1)."""
+    try:
+        import numpy as np
+        from rapidfuzz import fuzz, process
+    except ImportError:
+        for i in range(len(names)):
+            for j in range(i + 1, len(names)):
+                if SequenceMatcher(None, names[i], names[j]).ratio() >= threshold:
+                    yield i, j
+        return
+
+    scores = process.cdist(names, names, scorer=fuzz.token_sort_ratio,
+                           score_cutoff=threshold * 100, dtype=np.uint8)
+    rows, cols = np.nonzero(np.triu(scores, k=1))
+    yield from zip(rows.tolist(), cols.tolist())
+
+
+def _merge(cluster):
+    """One Lead per cluster: the most complete record, gaps filled from the others."""
+    cluster = sorted(cluster, key=lambda lead: -sum(
+        1 for name in FIELDS if name != 'search_terms' and getattr(lead, name)
+    ))
+    merged = Lead.from_dict(cluster[0].to_dict())
+    merged.search_terms = list(cluster[0].search_terms)
+    for lead in cluster[1:]:
+        for name in FIELDS:
+            if name == 'search_terms':
+                merged.search_terms += [term for term in lead.search_terms if term not in merged.search_terms]
+            elif not getattr(merged, name) and getattr(lead, name):
+                setattr(merged, name, getattr(lead, name))
+    return merged
+
+
+def find_clusters(leads, threshold=0.9, max_block_size=MAX_BLOCK_SIZE):
+    """
+    Return clusters (lists of indexes into leads) of records that refer to
+    the same business. Singletons are included.
+
+    Leads with the same place ID, phone or domain match, and so do leads
+    whose names score at least `threshold`, unless their clusters both carry
+    place IDs, phone numbers or domains and have none in common. A lead
+    without a phone therefore cannot chain two leads with different phones
+    together, and two Maps places are never merged on a shared website.
+    """
+    place_ids = [lead.place_id or None for lead in leads]
+    phones = [normalize_phone(lead.phone) for lead in leads]
+    domains = [lead_domain_key(lead) for lead in leads]
+    names = [normalize_name(lead.title) for lead in leads]
+
+    union_find = _UnionFind(place_ids, phones, domains)
+
+    # Exact blocks: shared place ID or phone
+    for keys in (place_ids, phones):
+        first_seen = {}
+        for index, key in enumerate(keys):
+            if key is None:
+                continue
+            if key in first_seen:
+                union_find.join(first_seen[key], index)
+            else:
+                first_seen[key] = index
+
+    # Shared domain; a Maps place only matches leads without a place ID on it
+    first_seen, first_unplaced = {}, {}
+    for index, key in enumerate(domains):
+        if key is None:
+            continue
+        other = first_unplaced.get(key) if place_ids[index] else first_seen.get(key)
+        if other is not None:
+            union_find.join(other, index)
+        first_seen.setdefault(key, index)
+        if not place_ids[index]:
+            first_unplaced.setdefault(key, index)
+
+    # Fuzzy blocks: shared name token, scored in one batch per block
+    blocks = defaultdict(list)
+    for index, name in enumerate(names):
+        for token in set(name.split()):
+            if len(token) > 2:
+                blocks[token].append(index)
+
+    for members in blocks.values():
+        if len(members) < 2 or len(members) > max_block_size:
+            continue
+        for i, j in _similar_pairs([names[index] for index in members], threshold):
+            union_find.join(members[i], members[j])
+
+    clusters = defaultdict(list)
+    for index in range(len(leads)):
+        clusters[union_find.find(index)].append(index)
+    return list(clusters.values())
+
+
+def resolve_duplicates(leads, threshold=0.9, max_block_size=MAX_BLOCK_SIZE):
+    """Return one merged Lead per cluster of duplicates, in first-seen order."""
+    leads = list(leads)
+    return [_merge([leads[index] for index in cluster])
+            for cluster in find_clusters(leads, threshold, max_block_size)]
+
+
+def main():
+    from scrapekit.leadstore import LeadStore
+
+    parser = argparse.ArgumentParser(description='Merge duplicate leads from the lead store')
+    parser.add_argument('--db', default='leads.db', help='SQLite lead store to read')
+    parser.add_argument('--out', default='deduped_leads.csv', help='CSV file to write')
+    parser.add_argument('--threshold', type=float, default=0.9,
+                        help='Name similarity (0-1) needed to merge leads without a shared phone or domain')
+    args = parser.parse_args()
+
+    with LeadStore(args.db) as store:
+        leads = list(store.iter_leads())
+    merged = resolve_duplicates(leads, args.threshold)
+
+    with open(args.out, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(leads_to_rows(merged, FIELDS))
+    print(f"Merged {len(leads)} leads into {len(merged)} businesses, saved to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
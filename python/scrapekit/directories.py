@@ -0,0 +1,328 @@
+"""
+Streaming business directory crawler.
+
+Each directory has a small listing parser registered with
+@register_directory. DirectoryCrawler follows a directory's pagination
+lazily and yields company website leads as soon as each listing page is
+parsed, so website scraping can start while later pages are still being
+fetched. Directories are crawled in parallel, and each one has its own
+small pool for prefetching the next page and resolving profile pages.
+
+With a RobotsStore, directory pages disallowed by robots.txt are never
+fetched: a directory whose search page is disallowed is dropped, and
+disallowed next pages and profile pages are skipped.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, quote_plus, urljoin, urlparse
+
+from scrapekit.domains import dedup_key, registered_domain
+from scrapekit.extract import anchor_text, iter_anchors, parse_attrs
+
+DIRECTORY_PARSERS = {}
+
+
+def register_directory(parser_class):
+    """Class decorator adding a DirectoryParser to the registry under its name."""
+    DIRECTORY_PARSERS[parser_class.name] = parser_class
+    return parser_class
+
+
+def _links(html, base_url):
+    """Yield (attrs, text, absolute href) for every link with an href."""
+    for attr_string, inner_html in iter_anchors(html):
+        attrs = parse_attrs(attr_string)
+        href = attrs.get('href')
+        if href and not href.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
+            yield attrs, anchor_text(inner_html), urljoin(base_url, href)
+
+
+def _has_class(attrs, name):
+    return name in attrs.get('class', '').split()
+
+
+def _is_external(url, directory_url):
+    return (
+        urlparse(url).scheme in ('http', 'https')
+        and registered_domain(url) != registered_domain(directory_url)
+    )
+
+
+class DirectoryParser:
+    """
+    Base class for a directory's listing parser.
+
+    Subclasses set `name`, build search URLs, and turn a listing page into
+    (leads, next page URL). Directories that only link to their own profile
+    pages set needs_profile and implement parse_profile to pull the company
+    website from a profile page.
+    """
+
+    name = None
+    needs_profile = False
+
+    def search_url(self, industry, location=None):
+        raise NotImplementedError
+
+    def parse_listing(self, html, page_url):
+        """Return ([{'title', 'url'}], next_page_url or None)."""
+        raise NotImplementedError
+
+    def parse_profile(self, html, profile_url):
+        """Return the company website linked from a profile page, or None."""
+        for attrs, text, url in _links(html, profile_url):
+            label = f"{text} {attrs.get('aria-label', '')} {attrs.get('itemprop', '')}".lower()
+            if ('website' in label or attrs.get('itemprop') == 'url') and _is_external(url, profile_url):
+                return url
+        return None
+
+    def find_next_page(self, html, page_url):
+        for attrs, text, url in _links(html, page_url):
+            if (
+                attrs.get('rel') == 'next'
+                or _has_class(attrs, 'next')
+                or text.lower() in ('next', 'next page', 'next >', 'next »', '›', '»')
+            ):
+                return url
+        return None
+
+
+@register_directory
+class YellowPagesParser(DirectoryParser):
+    name = 'yellowpages'
+
+    def search_url(self, industry, location=None):
+        url = f"https://www.yellowpages.com/search?search_terms={quote_plus(industry)}"
+        if location:
+            url += f"&geo_location_terms={quote_plus(location)}"
+        return url
+
+    def parse_listing(self, html, page_url):
+        leads = []
+        business_name = None
+        for attrs, text, url in _links(html, page_url):
+            if _has_class(attrs, 'business-name'):
+                business_name = text
+            elif _has_class(attrs, 'track-visit-website') and _is_external(url, page_url):
+                leads.append({'title': business_name or text, 'url': url})
+                business_name = None
+        return leads, self.find_next_page(html, page_url)
+
+
+@register_directory
+class MantaParser(DirectoryParser):
+    name = 'manta'
+    needs_profile = True
+
+    def search_url(self, industry, location=None):
+        url = f"https://www.manta.com/search?search={quote_plus(industry)}"
+        if location:
+            url += f"&city={quote_plus(location)}"
+        return url
+
+    def parse_listing(self, html, page_url):
+        leads = []
+        seen = set()
+        for attrs, text, url in _links(html, page_url):
+            if urlparse(url).path.startswith('/c/') and text and url not in seen:
+                seen.add(url)
+                leads.append({'title': text, 'url': url})
+        return leads, self.find_next_page(html, page_url)
+
+
+@register_directory
+class ChamberOfCommerceParser(DirectoryParser):
+    name = 'chamberofcommerce'
+    needs_profile = True
+
+    def search_url(self, industry, location=None):
+        url = f"https://www.chamberofcommerce.com/search?what={quote_plus(industry)}"
+        if location:
+            url += f"&where={quote_plus(location)}"
+        return url
+
+    def parse_listing(self, html, page_url):
+        leads = []
+        seen = set()
+        for attrs, text, url in _links(html, page_url):
+            path = urlparse(url).path
+            if (path.startswith('/business-directory/') and path.count('/') >= 4
+                    and text and url not in seen):
+                seen.add(url)
+                leads.append({'title': text, 'url': url})
+        return leads, self.find_next_page(html, page_url)
+
+
+@register_directory
+class ClutchParser(DirectoryParser):
+    name = 'clutch'
+
+    # Clutch lists by service category rather than free-text search
+    CATEGORIES = {
+        'marketing': 'agencies/digital-marketing',
+        'digital marketing': 'agencies/digital-marketing',
+        'advertising': 'agencies/digital-marketing',
+        'seo': 'seo-firms',
+        'design': 'web-designers',
+        'web design': 'web-designers',
+        'web development': 'web-developers',
+        'development': 'web-developers',
+        'software': 'developers',
+        'custom software': 'developers',
+        'tech': 'developers',
+        'technology': 'developers',
+        'data analysis': 'it-services/analytics',
+    }
+
+    def search_url(self, industry, location=None):
+        category = self.CATEGORIES.get(industry.lower(), 'it-services')
+        return f"https://clutch.co/{category}"
+
+    def parse_listing(self, html, page_url):
+        leads = []
+        company_name = None
+        for attrs, text, url in _links(html, page_url):
+            if _has_class(attrs, 'provider__title-link') or _has_class(attrs, 'company_title'):
+                company_name = text
+            elif _has_class(attrs, 'website-link__item'):
+                # Website links go through Clutch's redirector with the target in ?u=
+                target = parse_qs(urlparse(url).query).get('u', [url])[0]
+                if _is_external(target, page_url):
+                    leads.append({'title': company_name or text, 'url': target})
+                company_name = None
+        return leads, self.find_next_page(html, page_url)
+
+
+class DirectoryCrawler:
+    """Crawl directories concurrently and stream company website leads."""
+
+    def __init__(self, session, max_pages=5, concurrency=2, page_delay=1.0, timeout=15, buffer_size=100,
+                 robots=None):
+        self.session = session
+        self.robots = robots
+        self.max_pages = max_pages
+        self.concurrency = concurrency
+        self.page_delay = page_delay
+        self.timeout = timeout
+        self.buffer_size = buffer_size
+
+    def _allowed(self, url):
+        return self.robots is None or self.robots.can_fetch(url)
+
+    def _fetch(self, url):
+        if not self._allowed(url):
+            print(f"Skipping directory page {url}: disallowed by robots.txt")
+            return None
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except Exception as e:
+            print(f"Error fetching directory page {url}: {e}")
+            return None
+        if response.status_code != 200:
+            print(f"Directory page {url} returned status {response.status_code}")
+            return None
+        return response.text
+
+    def _resolve_profile(self, parser, lead):
+        html = self._fetch(lead['url'])
+        website = parser.parse_profile(html, lead['url']) if html else None
+        if website:
+            return {'title': lead['title'], 'url': website, 'source': parser.name}
+        return None
+
+    def crawl(self, parser, industry, location=None):
+        """Yield leads from one directory, one listing page at a time."""
+        page_url = parser.search_url(industry, location)
+        if not self._allowed(page_url):
+            print(f"Skipping {parser.name}: its robots.txt disallows {urlparse(page_url).path}")
+            return
+        print(f"Crawling {parser.name}: {page_url}")
+        pages = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            html = self._fetch(page_url)
+            while html is not None:
+                pages += 1
+                listings, next_url = parser.parse_listing(html, page_url)
+                print(f"{parser.name} page {pages}: {len(listings)} listings")
+                if not listings:
+                    break
+
+                # Prefetch the next page while this page's listings are handed out
+                next_page = None
+                if next_url and pages < self.max_pages:
+                    crawl_delay = self.robots.crawl_delay(next_url) if self.robots else 0
+                    time.sleep(max(self.page_delay, crawl_delay))
+                    next_page = pool.submit(self._fetch, next_url)
+
+                if parser.needs_profile:
+                    for lead in pool.map(lambda listing: self._resolve_profile(parser, listing), listings):
+                        if lead:
+                            yield lead
+                else:
+                    for listing in listings:
+                        yield dict(listing, source=parser.name)
+
+                if next_page is None:
+                    break
+                page_url = next_url
+                html = next_page.result()
+
+    def iter_leads(self, directories, industry, location=None):
+        """
+        Crawl the named directories in parallel and yield unique company leads
+        as they are found. Stops the crawl threads if the consumer stops early.
+        """
+        parsers = []
+        for name in directories:
+            if name in DIRECTORY_PARSERS:
+                parsers.append(DIRECTORY_PARSERS[name]())
+            else:
+                print(f"No listing parser for directory '{name}', skipping")
+        if not parsers:
+            return
+
+        results = queue.Queue(maxsize=self.buffer_size)
+        stop = threading.Event()
+        finished = object()
+
+        def put(item):
+            """Queue an item unless the consumer has stopped; never blocks for good."""
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce(parser):
+            try:
+                for lead in self.crawl(parser, industry, location):
+                    if not put(lead):
+                        return
+            except Exception as e:
+                print(f"Error crawling {parser.name}: {e}")
+            finally:
+                put(finished)
+
+        threads = [threading.Thread(target=produce, args=(parser,), daemon=True) for parser in parsers]
+        for thread in threads:
+            thread.start()
+
+        seen = set()
+        remaining = len(threads)
+        try:
+            while remaining:
+                item = results.get()
+                if item is finished:
+                    remaining -= 1
+                    continue
+                key = dedup_key(item['url'])
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield item
+        finally:
+            stop.set()
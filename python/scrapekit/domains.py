@@ -0,0 +1,106 @@
+import json
+import os
+from urllib.parse import urlparse
+
+from scrapekit.records import Lead
+
+# Public suffixes with more than one label that we commonly see in leads.
+# Anything else is treated as a single-label suffix (example.com, example.io).
+MULTI_PART_SUFFIXES = {
+    'co.uk', 'org.uk', 'ac.uk', 'gov.uk', 'ltd.uk', 'plc.uk', 'me.uk',
+    'com.au', 'net.au', 'org.au', 'co.nz', 'org.nz', 'co.za', 'co.in',
+    'com.pk', 'com.br', 'com.mx', 'com.ar', 'com.sg', 'com.my', 'com.tr',
+    'co.jp', 'co.kr', 'com.cn', 'com.hk', 'com.tw',
+}
+
+# Sites that host many businesses under one domain. Leads on these are keyed
+# on the listing path instead, otherwise every Yelp page would look the same.
+AGGREGATOR_DOMAINS = {
+    'linkedin.com', 'yelp.com', 'facebook.com', 'instagram.com',
+    'twitter.com', 'google.com', 'yellowpages.com', 'manta.com',
+    'clutch.co', 'crunchbase.com', 'chamberofcommerce.com',
+}
+
+
+def registered_domain(url):
+    """Return the registered domain of a URL, e.g. 'https://www.x.co.uk/a' -> 'x.co.uk'."""
+    if '://' not in url:
+        url = f"http://{url}"
+    host = (urlparse(url).hostname or '').lower().rstrip('.')
+    labels = [label for label in host.split('.') if label]
+    if len(labels) <= 2:
+        return '.'.join(labels)
+    if '.'.join(labels[-2:]) in MULTI_PART_SUFFIXES:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+def dedup_key(url):
+    """Return the key used to decide whether two URLs point at the same company."""
+    domain = registered_domain(url)
+    if domain in AGGREGATOR_DOMAINS:
+        path = urlparse(url if '://' in url else f"http://{url}").path
+        segments = [segment for segment in path.lower().split('/') if segment]
+        return f"{domain}/{'/'.join(segments[:2])}"
+    return domain
+
+
+def lead_domain_key(lead):
+    """dedup_key of the company website behind a Lead, or None. Maps place pages are not company sites."""
+    url = lead.website or (None if lead.place_id else lead.url)
+    return dedup_key(url) if url else None
+
+
+class DomainIndex:
+    """
+    On-disk index of leads keyed on registered domain.
+
+    Each company is scraped once; later hits under a different search term or
+    URL variant only add the term to the stored lead.
+    """
+
+    def __init__(self, path='lead_index.json'):
+        self.path = path
+        self.leads = {}
+        self.load()
+
+    def load(self):
+        """Load the index from disk if it exists."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.leads = {key: Lead.from_dict(data) for key, data in json.load(f).items()}
+            print(f"Loaded {len(self.leads)} known domains from {self.path}")
+        except (OSError, ValueError) as e:
+            print(f"Could not read domain index {self.path}: {e}")
+
+    def save(self):
+        """Write the index to disk atomically."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({key: lead.to_dict() for key, lead in self.leads.items()}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def __contains__(self, url):
+        return dedup_key(url) in self.leads
+
+    def __len__(self):
+        return len(self.leads)
+
+    def get(self, url):
+        """Return the stored lead for a URL's domain, or None."""
+        return self.leads.get(dedup_key(url))
+
+    def add(self, lead, search_term=None):
+        """Store a freshly scraped Lead and return it."""
+        lead.search_terms = [search_term] if search_term else []
+        self.leads[dedup_key(lead.url)] = lead
+        return lead
+
+    def attach_term(self, url, search_term):
+        """Record that an already known domain was also found under search_term."""
+        lead = self.get(url)
+        if lead is not None and search_term and search_term not in lead.search_terms:
+            lead.search_terms.append(search_term)
+        return lead
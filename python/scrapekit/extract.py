@@ -0,0 +1,78 @@
+"""
+Lightweight contact extraction from raw HTML.
+
+Building a full BeautifulSoup tree for every page just to look at its links
+is the most expensive part of scraping a lead. The helpers here scan the
+page once for <a> tags with compiled regular expressions and never build a
+tree, so nothing but the matched links outlives the call.
+"""
+import re
+from html import unescape
+
+EMAIL_PATTERN = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+PHONE_PATTERN = re.compile(r'(\+\d{1,3}[-.\s]?)?(\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})')
+
+
+# Anchor tokenizer: matches each <a ...>...</a> in one left-to-right scan.
+# An unclosed <a> ends at the next <a> or at the end of the page.
+ANCHOR_PATTERN = re.compile(r'<a\b([^>]*)>(.*?)(?=</a\s*>|<a\b|$)', re.I | re.S)
+HREF_PATTERN = re.compile(r'\bhref\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))', re.I)
+TAG_PATTERN = re.compile(r'<[^>]*>')
+COMMENT_PATTERN = re.compile(r'<!--.*?-->', re.S)
+
+
+ATTR_PATTERN = re.compile(r'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))')
+
+
+def iter_anchors(html):
+    """Yield (attribute string, inner HTML) for every <a> tag in document order."""
+    if '<!--' in html:
+        html = COMMENT_PATTERN.sub('', html)
+    for match in ANCHOR_PATTERN.finditer(html):
+        yield match.group(1), match.group(2)
+
+
+def parse_attrs(attr_string):
+    """Parse the attribute string of a tag into a dict with lower-cased names."""
+    attrs = {}
+    for match in ATTR_PATTERN.finditer(attr_string):
+        value = next(group for group in match.groups()[1:] if group is not None)
+        attrs[match.group(1).lower()] = unescape(value)
+    return attrs
+
+
+def anchor_text(inner_html):
+    """Return the visible text of an anchor's inner HTML."""
+    return ' '.join(unescape(TAG_PATTERN.sub(' ', inner_html)).split())
+
+
+def extract_anchors(html):
+    """Return [(href, text)] for every link in the page, in document order."""
+    anchors = []
+    for attr_string, inner_html in iter_anchors(html):
+        href = HREF_PATTERN.search(attr_string)
+        if href:
+            href = unescape(next(group for group in href.groups() if group is not None))
+        anchors.append((href, anchor_text(inner_html)))
+    return anchors
+
+
+def find_emails(html):
+    return EMAIL_PATTERN.findall(html)
+
+
+def plausible_emails(html):
+    """Emails in the page minus placeholders and asset names like logo@2x.png."""
+    return [
+        email for email in EMAIL_PATTERN.findall(html)
+        if not (
+            'example' in email
+            or 'youremail' in email
+            or 'domain.com' in email
+            or email.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp'))
+        )
+    ]
+
+
+def find_phones(html):
+    return [''.join(match).strip() for match in PHONE_PATTERN.findall(html)]
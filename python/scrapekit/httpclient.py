@@ -0,0 +1,173 @@
+"""
+Shared HTTP client for the requests based tools.
+
+create_session() returns a requests session with connection pools sized to
+the number of workers using it, keep-alive and compressed transfers, bounded
+retries with jittered exponential backoff, and per-host counters. The first
+call also installs a small in-process DNS cache so repeated requests to the
+same hosts skip name resolution.
+"""
+import socket
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Many small business sites turn away the default python-requests User-Agent
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+}
+
+_dns_cache = {}
+_dns_lock = threading.Lock()
+_original_getaddrinfo = socket.getaddrinfo
+_dns_ttl = 300
+
+# Long crawls touch many hosts once; beyond this the oldest entries are dropped
+DNS_CACHE_MAX_ENTRIES = 4096
+
+
+def _cached_getaddrinfo(host, port, *args, **kwargs):
+    key = (host, port, args, tuple(sorted(kwargs.items())))
+    now = time.monotonic()
+    with _dns_lock:
+        cached = _dns_cache.get(key)
+        if cached:
+            if cached[0] > now:
+                return cached[1]
+            del _dns_cache[key]
+    result = _original_getaddrinfo(host, port, *args, **kwargs)
+    with _dns_lock:
+        if len(_dns_cache) >= DNS_CACHE_MAX_ENTRIES:
+            for expired in [k for k, (expires, _) in _dns_cache.items() if expires <= now]:
+                del _dns_cache[expired]
+            # Entries are in insertion order, so the first ones are the oldest
+            while len(_dns_cache) >= DNS_CACHE_MAX_ENTRIES:
+                del _dns_cache[next(iter(_dns_cache))]
+        _dns_cache[key] = (now + _dns_ttl, result)
+    return result
+
+
+def install_dns_cache(ttl=300):
+    """Cache socket.getaddrinfo results for ttl seconds, process wide."""
+    global _dns_ttl
+    _dns_ttl = ttl
+    socket.getaddrinfo = _cached_getaddrinfo
+
+
+class HostStats:
+    """Thread-safe per-host request counters."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hosts = {}
+
+    def record(self, host, elapsed, status=None, size=0, retries=0, error=False):
+        with self.lock:
+            stats = self.hosts.setdefault(host, {
+                'requests': 0, 'errors': 0, 'retries': 0, 'bytes': 0, 'seconds': 0.0, 'statuses': {}
+            })
+            stats['requests'] += 1
+            stats['retries'] += retries
+            stats['bytes'] += size
+            stats['seconds'] += elapsed
+            if error:
+                stats['errors'] += 1
+            if status is not None:
+                stats['statuses'][status] = stats['statuses'].get(status, 0) + 1
+
+    def report(self, top=20):
+        """Return a text table of the busiest hosts."""
+        with self.lock:
+            rows = sorted(self.hosts.items(), key=lambda item: item[1]['requests'], reverse=True)[:top]
+        lines = [f"{'host':40} {'reqs':>6} {'errs':>5} {'retry':>5} {'KB':>9} {'avg ms':>8}"]
+        for host, stats in rows:
+            avg_ms = stats['seconds'] / stats['requests'] * 1000 if stats['requests'] else 0
+            lines.append(
+                f"{host[:40]:40} {stats['requests']:>6} {stats['errors']:>5} {stats['retries']:>5} "
+                f"{stats['bytes'] / 1024:>9.1f} {avg_ms:>8.0f}"
+            )
+        return '\n'.join(lines)
+
+
+class PooledSession(requests.Session):
+    """requests.Session that records per-host counters for every request."""
+
+    def __init__(self):
+        super().__init__()
+        self.stats = HostStats()
+
+    def request(self, method, url, *args, **kwargs):
+        host = urlparse(url).hostname or ''
+        start = time.monotonic()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.exceptions.RequestException:
+            self.stats.record(host, time.monotonic() - start, error=True)
+            raise
+        retries = 0
+        history = getattr(getattr(response.raw, 'retries', None), 'history', None)
+        if history:
+            retries = len(history)
+        self.stats.record(
+            host, time.monotonic() - start,
+            status=response.status_code,
+            size=len(response.content) if not kwargs.get('stream') else 0,
+            retries=retries,
+            error=response.status_code >= 400
+        )
+        return response
+
+
+def _retry_policy(retries, backoff, connect_only=False):
+    kwargs = dict(
+        total=retries,
+        connect=retries,
+        read=0 if connect_only else retries,
+        status=0 if connect_only else retries,
+        backoff_factor=backoff,
+        status_forcelist=() if connect_only else RETRY_STATUSES,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    try:
+        # urllib3 2.x adds random jitter so parallel workers don't retry in lockstep
+        return Retry(backoff_jitter=backoff, **kwargs)
+    except TypeError:
+        return Retry(**kwargs)
+
+
+def create_session(workers=10, headers=None, retries=3, backoff=0.5, dns_ttl=300, connect_only=False):
+    """
+    Return a PooledSession tuned for `workers` threads sharing it.
+
+    Idempotent requests are retried up to `retries` times on connection
+    errors and on 429/5xx responses, waiting backoff * 2**n seconds plus
+    jitter between attempts. With connect_only=True only connection errors
+    are retried, so a request that reached the server is never sent again.
+    """
+    install_dns_cache(dns_ttl)
+
+    session = PooledSession()
+    adapter = HTTPAdapter(
+        # One pool per host in flight, each large enough for every worker
+        pool_connections=max(workers * 2, 10),
+        pool_maxsize=max(workers, 10),
+        max_retries=_retry_policy(retries, backoff, connect_only)
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        'Connection': 'keep-alive',
+        'Accept-Encoding': 'gzip, deflate',
+    })
+    if headers:
+        session.headers.update(headers)
+    return session
@@ -0,0 +1,176 @@
+"""
+SQLite lead store shared across runs.
+
+Every scraper run can merge its leads into one database instead of writing
+a fresh CSV. Maps places are matched on their place ID only, since branches
+of a chain share a website; other companies are matched on their domain,
+normalized phone number or email. All keys have unique indexes, so a merge
+only touches the rows of the new leads: existing rows get their missing
+fields filled in and last_seen bumped, unknown companies are inserted.
+Leads without any key are inserted as they are. Views give ready-made
+exports.
+"""
+import csv
+import sqlite3
+import time
+
+from scrapekit.domains import lead_domain_key
+from scrapekit.records import FIELDS, Lead, normalize_email, normalize_phone
+
+# Fields filled in on an existing row only when it has no value yet
+DATA_FIELDS = [name for name in FIELDS if name != 'search_terms']
+
+# Match keys in priority order
+KEY_COLUMNS = ('place_key', 'domain_key', 'email_key', 'phone_key')
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS leads (
+    id INTEGER PRIMARY KEY,
+    place_key TEXT,
+    domain_key TEXT,
+    email_key TEXT,
+    phone_key TEXT,
+    {', '.join(f'{name} TEXT' for name in FIELDS)},
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS leads_place ON leads(place_key) WHERE place_key IS NOT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS leads_domain ON leads(domain_key) WHERE domain_key IS NOT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS leads_email ON leads(email_key) WHERE email_key IS NOT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS leads_phone ON leads(phone_key) WHERE phone_key IS NOT NULL;
+CREATE INDEX IF NOT EXISTS leads_last_seen ON leads(last_seen);
+CREATE VIEW IF NOT EXISTS leads_with_contact AS
+    SELECT * FROM leads WHERE email IS NOT NULL OR phone IS NOT NULL;
+CREATE VIEW IF NOT EXISTS leads_with_email AS
+    SELECT * FROM leads WHERE email IS NOT NULL;
+"""
+
+EXPORT_VIEWS = ('leads', 'leads_with_contact', 'leads_with_email')
+
+
+def lead_keys(lead):
+    """
+    (place_key, domain_key, email_key, phone_key) for a Lead; any of them
+    may be None. Places are not keyed on their domain, which chain branches share.
+    """
+    if lead.place_id:
+        return lead.place_id, None, normalize_email(lead.email), normalize_phone(lead.phone)
+    return None, lead_domain_key(lead), normalize_email(lead.email), normalize_phone(lead.phone)
+
+
+class LeadStore:
+    """Upserting store of leads in an SQLite database."""
+
+    def __init__(self, path='leads.db'):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM leads').fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    def _owner(self, column, value):
+        if value is None:
+            return None
+        row = self.conn.execute(f'SELECT id FROM leads WHERE {column} = ?', (value,)).fetchone()
+        return row[0] if row else None
+
+    def _insert(self, lead, keys, now):
+        columns = list(KEY_COLUMNS) + list(FIELDS) + ['first_seen', 'last_seen']
+        values = list(keys) + [self._value(lead, name) for name in FIELDS] + [now, now]
+        self.conn.execute(
+            f"INSERT INTO leads ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            values
+        )
+
+    def _update(self, row_id, lead, keys, now):
+        row = self.conn.execute('SELECT search_terms FROM leads WHERE id = ?', (row_id,)).fetchone()
+        terms = [term for term in (row['search_terms'] or '').split('; ') if term]
+        terms += [term for term in lead.search_terms if term not in terms]
+
+        assignments = [f'{column} = COALESCE({column}, ?)' for column in KEY_COLUMNS]
+        assignments += [f'{name} = COALESCE({name}, ?)' for name in DATA_FIELDS]
+        assignments += ['search_terms = ?', 'last_seen = ?']
+        values = list(keys) + [self._value(lead, name) for name in DATA_FIELDS]
+        values += ['; '.join(terms) or None, now, row_id]
+        self.conn.execute(f"UPDATE leads SET {', '.join(assignments)} WHERE id = ?", values)
+
+    @staticmethod
+    def _value(lead, name):
+        value = getattr(lead, name)
+        if name == 'search_terms':
+            return '; '.join(value) or None
+        return None if value in (None, '') else str(value)
+
+    def merge(self, leads):
+        """
+        Upsert leads in one transaction and return (inserted, updated).
+
+        A lead with a place ID only matches the row of that place; other
+        leads match on domain, then email, then phone. A key already held by
+        a different row is not stored with the lead, so the unique indexes
+        never conflict.
+        """
+        inserted = updated = 0
+        now = time.time()
+        with self.conn:
+            for lead in leads:
+                keys = lead_keys(lead)
+                owners = [self._owner(column, value) for column, value in zip(KEY_COLUMNS, keys)]
+                if keys[0]:
+                    target = owners[0]
+                else:
+                    target = next((owner for owner in owners if owner is not None), None)
+                keys = [None if owner not in (None, target) else value
+                        for owner, value in zip(owners, keys)]
+                if target is None:
+                    self._insert(lead, keys, now)
+                    inserted += 1
+                else:
+                    self._update(target, lead, keys, now)
+                    updated += 1
+        return inserted, updated
+
+    def iter_leads(self, view='leads', since=None):
+        """Yield Lead records from a table or view, optionally only those seen since a timestamp."""
+        if view not in EXPORT_VIEWS:
+            raise ValueError(f"Unknown view '{view}', expected one of {', '.join(EXPORT_VIEWS)}")
+        query = f'SELECT * FROM {view}'
+        params = ()
+        if since is not None:
+            query += ' WHERE last_seen >= ?'
+            params = (since,)
+        for row in self.conn.execute(query + ' ORDER BY id', params):
+            data = {name: row[name] for name in FIELDS}
+            data['search_terms'] = [term for term in (row['search_terms'] or '').split('; ') if term]
+            yield Lead(**data)
+
+    def export_csv(self, filename, view='leads', columns=None, since=None):
+        """Stream a view to CSV without loading it into memory. Returns the row count."""
+        columns = list(columns or FIELDS) + ['first_seen', 'last_seen']
+        if view not in EXPORT_VIEWS:
+            raise ValueError(f"Unknown view '{view}', expected one of {', '.join(EXPORT_VIEWS)}")
+        query = f"SELECT {', '.join(columns)} FROM {view}"
+        params = ()
+        if since is not None:
+            query += ' WHERE last_seen >= ?'
+            params = (since,)
+        count = 0
+        with open(filename, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for row in self.conn.execute(query + ' ORDER BY id', params):
+                writer.writerow(row)
+                count += 1
+        return count
@@ -0,0 +1,111 @@
+"""
+Background website contact lookup.
+
+Browser based scrapers should not leave the page they are crawling to visit
+each business website. WebsiteLookupQueue takes leads with a website as
+they are found and looks up their email and phone over plain HTTP on a
+background thread, using PoliteScheduler for per-host politeness and
+ContactDiscovery for contact pages. Results are written straight onto the
+Lead records; join() waits for the queue to drain.
+
+    lookup = WebsiteLookupQueue()
+    lookup.start()
+    for lead in crawl():
+        lookup.submit(lead)
+    lookup.join()
+"""
+import queue
+import threading
+
+from scrapekit.contact import ContactDiscovery
+from scrapekit.extract import find_phones, plausible_emails
+from scrapekit.politeness import PoliteScheduler
+from scrapekit.robots import RobotsStore
+from scrapekit.timing import StageTimer
+
+_DONE = object()
+
+
+class WebsiteLookupQueue:
+    """Queue of leads whose websites are scraped for contact details by a worker pool."""
+
+    def __init__(self, session=None, max_workers=16, host_delay=(1, 3), timeout=15, respect_robots=True,
+                 timer=None, headers=None):
+        if session is None:
+            from scrapekit.httpclient import BROWSER_HEADERS, create_session
+            session = create_session(workers=max_workers, headers=headers or BROWSER_HEADERS)
+        self.session = session
+        self.timeout = timeout
+        # Website fetches and contact page searches are timed as their own stages
+        self.timer = timer or StageTimer()
+        self.robots = RobotsStore(session) if respect_robots else None
+        self.scheduler = PoliteScheduler(
+            min_delay=host_delay[0],
+            max_delay=host_delay[1],
+            max_concurrency=max_workers,
+            robots=self.robots
+        )
+        self.contact_discovery = ContactDiscovery(session, timeout=timeout, robots=self.robots)
+        self.queue = queue.Queue()
+        self.submitted = set()
+        self.thread = None
+        self.completed = []
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def submit(self, lead):
+        """Queue a lead for lookup if it has a website and was not queued before."""
+        if not lead.website or id(lead) in self.submitted:
+            return False
+        self.submitted.add(id(lead))
+        self.queue.put(lead)
+        return True
+
+    def _jobs(self):
+        while True:
+            lead = self.queue.get()
+            if lead is _DONE:
+                return
+            yield lead.website, self._lookup, (lead,)
+
+    def _run(self):
+        results = self.scheduler.run(self._jobs())
+        self.completed = [lead for lead in results if lead is not None]
+
+    def _lookup(self, lead):
+        """Fetch a lead's website and fill in its missing email, phone and contact page."""
+        contact_info = {'url': lead.website, 'email': None, 'phone': None, 'address': None, 'contact_page': None}
+        with self.timer.span('website_fetch', url=lead.website):
+            response = self.session.get(lead.website, timeout=self.timeout)
+        if response.status_code != 200:
+            print(f"Failed to access {lead.website} - Status code: {response.status_code}")
+            return None
+
+        page = response.text
+        emails = plausible_emails(page)
+        phones = find_phones(page)
+        contact_info['email'] = emails[0] if emails else None
+        contact_info['phone'] = phones[0] if phones else None
+        with self.timer.span('contact_search', url=lead.website):
+            contact_info = self.contact_discovery.discover(lead.website, page, contact_info)
+
+        for field in ('email', 'phone', 'address', 'contact_page'):
+            if contact_info[field] and not getattr(lead, field):
+                setattr(lead, field, contact_info[field])
+        if lead.email:
+            print(f"Found email for {lead.title}: {lead.email}")
+        return lead
+
+    def join(self):
+        """Wait until every queued website has been looked up; `completed` then lists the leads whose site was read."""
+        if self.thread is None:
+            return
+        self.queue.put(_DONE)
+        self.thread.join()
+        self.thread = None
+        if self.robots:
+            self.robots.save()
+        print(f"Looked up {len(self.completed)}/{len(self.submitted)} websites. {self.contact_discovery.report()}")
@@ -0,0 +1,219 @@
+"""
+Google Maps result feed helpers.
+
+Opening every result to read its details costs a click, a page render and a
+Back click per business. The result cards in the feed already show the
+name, rating, category, address, phone and website for most listings, so
+FEED_CARDS_SCRIPT reads every loaded card in one execute_script call and
+parse_feed_card turns each into a Lead.
+
+FeedTracker remembers which listings were handed out by place ID, so a
+listing is processed once however often the feed re-renders or reuses its
+card elements for other places, and the scroll
+loop can stop as soon as a scroll brings no new places.
+
+One search only exposes a limited feed, so large areas are covered by
+splitting them into Tiles, each searched as its own map viewport.
+"""
+import math
+import re
+
+from scrapekit.extract import PHONE_PATTERN
+from scrapekit.records import Lead
+
+# Collects the raw fields of every loaded card in one round trip. Cards are
+# not marked in the DOM, since Maps may reuse a card element for another
+# place; FeedTracker drops the ones already handed out by place ID.
+FEED_CARDS_SCRIPT = """
+const cards = [];
+for (const card of document.querySelectorAll("div[role='feed'] div[role='article']")) {
+    const link = card.querySelector("a[href*='/maps/place/']");
+    const website = card.querySelector("a[data-value='Website'], a[aria-label*='website' i]");
+    const phone = card.querySelector("span.UsdlK");
+    const stars = card.querySelector("span[role='img'][aria-label]");
+    cards.push({
+        name: card.getAttribute('aria-label') || '',
+        url: link ? link.href : null,
+        website: website ? website.href : null,
+        phone: phone ? phone.textContent : null,
+        stars: stars ? stars.getAttribute('aria-label') : null,
+        text: card.innerText || ''
+    });
+}
+return cards;
+"""
+
+# "4.5 stars 1,234 Reviews" (aria-label) or "4.5(1,234)" (card text)
+STARS_LABEL_PATTERN = re.compile(r'(\d+(?:[.,]\d)?)\s*stars?(?:\s+([\d,.]+)\s*reviews?)?', re.I)
+RATING_LINE_PATTERN = re.compile(r'^(\d(?:[.,]\d)?)\s*\(([\d,.]+)\)')
+
+# Feature ID (0x...:0x...) and place ID (ChIJ...) as encoded in place URLs
+FEATURE_ID_PATTERN = re.compile(r'!1s(0x[0-9a-f]+:0x[0-9a-f]+)', re.I)
+PLACE_ID_PATTERN = re.compile(r'!19s(ChIJ[\w-]+)|[?&]query_place_id=(ChIJ[\w-]+)')
+
+# Business name on a place page or in the details pane; its presence means the details rendered
+DETAILS_NAME_SELECTOR = "h1.DUwDvf, div.fontHeadlineSmall"
+
+# Card lines that are buttons or opening hours rather than details
+CARD_NOISE = {'website', 'directions', 'call', 'share', 'save', 'order online', 'reserve a table', 'sponsored'}
+HOURS_PREFIXES = ('open', 'closed', 'closes', 'opens', 'temporarily closed', 'permanently closed')
+
+
+def place_id_from_url(url):
+    """Stable ID of a place from its Maps URL, or the URL itself if none is encoded."""
+    if not url:
+        return None
+    match = PLACE_ID_PATTERN.search(url)
+    if match:
+        return match.group(1) or match.group(2)
+    match = FEATURE_ID_PATTERN.search(url)
+    if match:
+        return match.group(1).lower()
+    return url.split('?')[0]
+
+
+def _segments(line):
+    return [part.strip() for part in re.split(r'\s*[·⋅]\s*', line) if part.strip()]
+
+
+def parse_feed_card(card):
+    """Build a Lead from one FEED_CARDS_SCRIPT entry; details the card lacks stay None."""
+    lines = [line.strip() for line in card.get('text', '').splitlines() if line.strip()]
+    name = card.get('name') or (lines[0] if lines else None)
+    lead = Lead(
+        title=name,
+        url=card.get('url'),
+        website=card.get('website'),
+        source='google_maps',
+        place_id=place_id_from_url(card.get('url')),
+    )
+
+    match = STARS_LABEL_PATTERN.search(card.get('stars') or '')
+    if match:
+        lead.rating = match.group(1).replace(',', '.')
+        lead.reviews = match.group(2)
+
+    info_lines = []
+    for line in lines:
+        if line == name or line.lower() in CARD_NOISE:
+            continue
+        match = RATING_LINE_PATTERN.match(line)
+        if match:
+            lead.rating = lead.rating or match.group(1).replace(',', '.')
+            lead.reviews = lead.reviews or match.group(2)
+            line = line[match.end():]
+        if ('·' in line or '⋅' in line) and not line.lower().startswith(HOURS_PREFIXES):
+            info_lines.append(_segments(line))
+
+    # First detail line is "Category · $$ · Address", later ones hours and phone
+    if info_lines:
+        first = [part for part in info_lines[0] if not set(part) <= set('$€£₹')]
+        if first:
+            lead.category = first[0]
+        if len(first) > 1:
+            lead.address = first[-1]
+
+    phone = card.get('phone')
+    if not phone:
+        match = PHONE_PATTERN.search(card.get('text', ''))
+        phone = match.group(0) if match else None
+    lead.phone = phone.strip() if phone else None
+    return lead
+
+
+class FeedTracker:
+    """Hands out each feed listing once, keyed by place ID (or name when the card has no link)."""
+
+    def __init__(self):
+        self.seen = set()
+
+    def __len__(self):
+        return len(self.seen)
+
+    @staticmethod
+    def card_key(card):
+        return place_id_from_url(card.get('url')) or card.get('name') or None
+
+    def new_cards(self, cards):
+        """Return the cards whose place has not been seen yet, in feed order."""
+        fresh = []
+        for card in cards:
+            key = self.card_key(card)
+            if key and key not in self.seen:
+                self.seen.add(key)
+                fresh.append(card)
+        return fresh
+
+
+# Approximate kilometres per degree of latitude, and Web Mercator metres per
+# pixel at zoom 0 on the equator
+KM_PER_DEGREE = 111.32
+METERS_PER_PIXEL_Z0 = 156543.03
+
+COORDS_PATTERN = re.compile(r'!3d(-?\d+(?:\.\d+)?)!4d(-?\d+(?:\.\d+)?)')
+
+
+def coords_from_url(url):
+    """(lat, lng) of a place from the !3d/!4d parameters of its Maps URL, or None."""
+    match = COORDS_PATTERN.search(url or '')
+    return (float(match.group(1)), float(match.group(2))) if match else None
+
+
+class Tile:
+    """A latitude/longitude box searched as one Maps viewport."""
+
+    __slots__ = ('south', 'west', 'north', 'east', 'depth')
+
+    def __init__(self, south, west, north, east, depth=0):
+        self.south = south
+        self.west = west
+        self.north = north
+        self.east = east
+        self.depth = depth
+
+    def __repr__(self):
+        return f"Tile({self.south:.4f}, {self.west:.4f}, {self.north:.4f}, {self.east:.4f}, depth={self.depth})"
+
+    @property
+    def center(self):
+        return (self.south + self.north) / 2, (self.west + self.east) / 2
+
+    def width_km(self):
+        return (self.east - self.west) * KM_PER_DEGREE * math.cos(math.radians(self.center[0]))
+
+    def zoom(self, viewport_px=800):
+        """Zoom level at which the tile roughly fills a viewport_px wide map."""
+        meters_per_pixel = max(self.width_km(), 0.1) * 1000 / viewport_px
+        zoom = math.log2(METERS_PER_PIXEL_Z0 * math.cos(math.radians(self.center[0])) / meters_per_pixel)
+        return max(3, min(20, int(round(zoom))))
+
+    def contains(self, lat, lng):
+        return self.south <= lat <= self.north and self.west <= lng <= self.east
+
+    def split(self):
+        """The four quadrants of this tile, one level deeper."""
+        lat, lng = self.center
+        depth = self.depth + 1
+        return [
+            Tile(self.south, self.west, lat, lng, depth),
+            Tile(self.south, lng, lat, self.east, depth),
+            Tile(lat, self.west, self.north, lng, depth),
+            Tile(lat, lng, self.north, self.east, depth),
+        ]
+
+
+def tile_grid(south, west, north, east, cell_km):
+    """Cover a bounding box with tiles roughly cell_km wide and high."""
+    mid_lat = math.radians((south + north) / 2)
+    lat_step = cell_km / KM_PER_DEGREE
+    lng_step = cell_km / (KM_PER_DEGREE * max(math.cos(mid_lat), 0.01))
+    rows = max(1, math.ceil((north - south) / lat_step))
+    cols = max(1, math.ceil((east - west) / lng_step))
+    lat_step = (north - south) / rows
+    lng_step = (east - west) / cols
+    return [
+        Tile(south + row * lat_step, west + col * lng_step,
+             south + (row + 1) * lat_step, west + (col + 1) * lng_step)
+        for row in range(rows)
+        for col in range(cols)
+    ]
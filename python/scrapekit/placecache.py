@@ -0,0 +1,117 @@
+"""
+On-disk cache of Google Maps place details.
+
+Details are stored per place ID and per field with the time they were read,
+and each field has its own time to live: ratings and review counts change
+daily, addresses hardly ever. A repeat search only opens place pages and
+business websites for places whose cached details are missing or stale.
+Empty results are cached too, so a website without an email is not
+searched again until the email TTL runs out.
+
+SQLite keeps the cache safe to share between batch worker processes.
+"""
+import os
+import sqlite3
+import time
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'scrapekit', 'places.db')
+
+DAY = 24 * 60 * 60
+FIELD_TTLS = {
+    'title': 30 * DAY,
+    'url': 90 * DAY,
+    'address': 90 * DAY,
+    'category': 90 * DAY,
+    'phone': 30 * DAY,
+    'website': 30 * DAY,
+    'email': 30 * DAY,
+    'contact_page': 30 * DAY,
+    'rating': 1 * DAY,
+    'reviews': 1 * DAY,
+}
+
+# Fields read from a place page, and from the business website
+DETAIL_FIELDS = ('address', 'phone', 'website', 'category')
+WEBSITE_FIELDS = ('email', 'contact_page')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS place_fields (
+    place_id TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (place_id, field)
+) WITHOUT ROWID;
+"""
+
+
+class PlaceCache:
+    """Per-field, TTL-bound cache of place details keyed by place ID."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttls=None):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.ttls = dict(FIELD_TTLS, **(ttls or {}))
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        self.conn.close()
+
+    def _fresh_fields(self, place_id):
+        """{field: value} of the place's cached fields that are still within their TTL."""
+        now = time.time()
+        rows = self.conn.execute(
+            'SELECT field, value, fetched_at FROM place_fields WHERE place_id = ?', (place_id,)
+        )
+        return {
+            field: value for field, value, fetched_at in rows
+            if now - fetched_at < self.ttls.get(field, 0)
+        }
+
+    def is_fresh(self, place_id, fields):
+        """True if every one of fields is cached for the place and not stale."""
+        if not place_id:
+            return False
+        fresh = self._fresh_fields(place_id)
+        if all(field in fresh for field in fields):
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def fill(self, lead):
+        """Fill the lead's empty fields from fresh cached values."""
+        if not lead.place_id:
+            return lead
+        for field, value in self._fresh_fields(lead.place_id).items():
+            if value and not getattr(lead, field):
+                setattr(lead, field, value)
+        return lead
+
+    def update(self, leads, fields, include_empty=False):
+        """
+        Store the given fields of each lead with the current time. Empty
+        values are only stored with include_empty, i.e. when their absence
+        was actually checked.
+        """
+        now = time.time()
+        rows = []
+        for lead in leads:
+            if not lead.place_id:
+                continue
+            for field in fields:
+                value = getattr(lead, field)
+                if value or include_empty:
+                    rows.append((lead.place_id, field, None if value is None else str(value), now))
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO place_fields (place_id, field, value, fetched_at) VALUES (?, ?, ?, ?)',
+                rows
+            )
+
+    def report(self):
+        return f"Place cache: {self.hits} fresh, {self.misses} new or stale"
@@ -0,0 +1,113 @@
+import asyncio
+import random
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+
+class _HostState:
+    def __init__(self, max_in_flight):
+        self.slots = asyncio.Semaphore(max_in_flight)
+        self.turn = asyncio.Lock()
+        self.next_start = 0.0
+
+
+class PoliteScheduler:
+    """
+    Async fetch engine with per-host politeness.
+
+    Jobs are blocking fetch functions (e.g. a requests based scraper method)
+    run on a thread pool. Each host gets at most max_in_flight_per_host jobs
+    at a time and a random gap of min_delay..max_delay seconds between job
+    starts, while jobs for different hosts run in parallel up to
+    max_concurrency.
+
+    With a RobotsStore, URLs disallowed by robots.txt are skipped (their
+    result is None) and a site's Crawl-delay is used when it is longer than
+    the random gap. Fetching a new host's robots.txt and sitemaps takes the
+    host's turn like any other request, and the sitemaps are spaced out too.
+    """
+
+    def __init__(self, min_delay=2.0, max_delay=5.0, max_in_flight_per_host=1, max_concurrency=16, robots=None):
+        self.robots = robots
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.max_in_flight_per_host = max_in_flight_per_host
+        self.max_concurrency = max_concurrency
+        self._hosts = {}
+
+    def _host_state(self, url):
+        host = (urlparse(url).hostname or '').lower()
+        if host.startswith('www.'):
+            host = host[4:]
+        if host not in self._hosts:
+            self._hosts[host] = _HostState(self.max_in_flight_per_host)
+        return self._hosts[host]
+
+    async def _wait_turn(self, state, loop, crawl_delay=0):
+        async with state.turn:
+            delay = state.next_start - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            gap = max(random.uniform(self.min_delay, self.max_delay), crawl_delay)
+            state.next_start = loop.time() + gap
+
+    async def _fetch_rules(self, url, state, loop, executor):
+        """SiteRules for the URL; fetching them for a new host counts as the host's requests."""
+        if self.robots.is_cached(url):
+            return await loop.run_in_executor(executor, self.robots.get, url)
+        await self._wait_turn(state, loop)
+        async with state.turn:
+            rules = await loop.run_in_executor(
+                executor, self.robots.get, url, (self.min_delay, self.max_delay)
+            )
+            # The next request waits a full gap after the last robots/sitemap fetch
+            gap = max(random.uniform(self.min_delay, self.max_delay), rules.crawl_delay(self.robots.user_agent))
+            state.next_start = max(state.next_start, loop.time() + gap)
+        return rules
+
+    async def _run_job(self, url, fn, args, executor, concurrency):
+        loop = asyncio.get_running_loop()
+        state = self._host_state(url)
+        async with state.slots:
+            crawl_delay = 0
+            if self.robots:
+                rules = await self._fetch_rules(url, state, loop, executor)
+                if not rules.can_fetch(url, self.robots.user_agent):
+                    print(f"Skipping {url}: disallowed by robots.txt")
+                    return None
+                crawl_delay = rules.crawl_delay(self.robots.user_agent)
+            await self._wait_turn(state, loop, crawl_delay)
+            async with concurrency:
+                try:
+                    return await loop.run_in_executor(executor, fn, *args)
+                except Exception as e:
+                    print(f"Error fetching {url}: {e}")
+                    return None
+
+    async def _run_all(self, jobs):
+        # Host state holds asyncio primitives bound to this event loop
+        self._hosts = {}
+        loop = asyncio.get_running_loop()
+        concurrency = asyncio.Semaphore(self.max_concurrency)
+        exhausted = object()
+        tasks = []
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor, \
+                ThreadPoolExecutor(max_workers=1) as feeder:
+            # Pull jobs on a separate thread so a slow generator (e.g. a
+            # directory crawl) never blocks jobs that are already running
+            jobs = iter(jobs)
+            while True:
+                job = await loop.run_in_executor(feeder, next, jobs, exhausted)
+                if job is exhausted:
+                    break
+                url, fn, args = job
+                tasks.append(asyncio.ensure_future(self._run_job(url, fn, args, executor, concurrency)))
+            return await asyncio.gather(*tasks)
+
+    def run(self, jobs):
+        """
+        Run jobs given as (url, fn, args) tuples and return their results in
+        order. jobs may be a generator; each job starts as soon as it is
+        produced. A job that raises yields None.
+        """
+        return asyncio.run(self._run_all(jobs))
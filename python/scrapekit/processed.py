@@ -0,0 +1,136 @@
+"""
+SQLite record of contacts a scraper has already processed.
+
+Membership is checked with a primary key lookup instead of loading the
+whole history into memory at startup, and new contacts are written in
+batches of batch_size per commit. The old processed_contacts.csv format is
+imported once (and again only if the file has changed since); lines that
+are not valid UTF-8 are decoded as cp1252 instead of being dropped, so a
+bad byte never costs the history.
+
+    with ProcessedContacts('processed_contacts.db') as processed:
+        processed.import_csv('processed_contacts.csv')
+        for profile_id in processed.unprocessed(page_of_ids):
+            ...
+            processed.add(profile_id, name, email)
+"""
+import csv
+import os
+import sqlite3
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS processed (
+    profile_id TEXT PRIMARY KEY,
+    name TEXT,
+    email TEXT,
+    processed_at TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+"""
+
+
+def _decode_lines(f):
+    """Decode each line of a binary file as UTF-8, falling back to cp1252 for bad lines."""
+    for number, raw in enumerate(f):
+        try:
+            line = raw.decode('utf-8')
+        except UnicodeDecodeError:
+            line = raw.decode('cp1252', errors='replace')
+        yield line.lstrip('\ufeff') if number == 0 else line
+
+
+class ProcessedContacts:
+    """Set-like store of processed profile IDs with their name and email."""
+
+    def __init__(self, path='processed_contacts.db', batch_size=10):
+        self.path = path
+        self.batch_size = batch_size
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+        self.pending = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __contains__(self, profile_id):
+        if profile_id in self.pending:
+            return True
+        return self.conn.execute(
+            'SELECT 1 FROM processed WHERE profile_id = ?', (profile_id,)
+        ).fetchone() is not None
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM processed').fetchone()[0] + len(self.pending)
+
+    def unprocessed(self, profile_ids):
+        """The given profile IDs that are not recorded yet, in order, checked in one query per 500 IDs."""
+        profile_ids = list(dict.fromkeys(profile_ids))
+        seen = set(self.pending)
+        for start in range(0, len(profile_ids), 500):
+            chunk = profile_ids[start:start + 500]
+            seen.update(row[0] for row in self.conn.execute(
+                f"SELECT profile_id FROM processed WHERE profile_id IN ({', '.join('?' * len(chunk))})", chunk
+            ))
+        return [profile_id for profile_id in profile_ids if profile_id not in seen]
+
+    def add(self, profile_id, name, email, processed_at=None):
+        """Record a processed contact; written to the database every batch_size contacts."""
+        self.pending[profile_id] = (profile_id, name, email, processed_at or datetime.now().isoformat())
+        if len(self.pending) >= self.batch_size:
+            return self.flush()
+        return []
+
+    def flush(self):
+        """Commit the pending contacts and return their (profile_id, name, email, processed_at) rows."""
+        rows = list(self.pending.values())
+        if rows:
+            with self.conn:
+                self.conn.executemany('INSERT OR REPLACE INTO processed VALUES (?, ?, ?, ?)', rows)
+            self.pending = {}
+        return rows
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', (key, str(value)))
+
+    def import_csv(self, filename):
+        """
+        Import a processed_contacts.csv (profile_id, name, email, timestamp
+        rows) unless it is unchanged since the last import. Contacts already
+        in the store are kept. Returns the number of new contacts.
+        """
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            return 0
+        key = f"imported:{os.path.abspath(filename)}"
+        signature = f"{stat.st_size}:{int(stat.st_mtime)}"
+        if self.get_meta(key) == signature:
+            return 0
+
+        before = len(self)
+        with open(filename, 'rb') as f, self.conn:
+            rows = (
+                (row + [None] * 4)[:4]
+                for row in csv.reader(_decode_lines(f))
+                if row and row[0].strip()
+            )
+            self.conn.executemany('INSERT OR IGNORE INTO processed VALUES (?, ?, ?, ?)', rows)
+            self.conn.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', (key, signature))
+        return len(self) - before
+
+    def close(self):
+        self.flush()
+        self.conn.close()
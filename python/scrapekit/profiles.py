@@ -0,0 +1,147 @@
+import os
+import shutil
+import socket
+import time
+
+DEFAULT_PROFILE_ROOT = os.path.join(os.path.expanduser('~'), '.cache', 'scrapekit', 'profiles')
+
+# Marker touched every time a profile is handed out; its mtime drives LRU eviction
+LAST_USED_MARKER = '.last_used'
+
+# Files Chrome keeps in an open profile; SingletonLock is a symlink to "<host>-<pid>"
+SINGLETON_FILES = ('SingletonLock', 'SingletonSocket', 'SingletonCookie')
+
+# On Windows Chrome instead keeps this file open, without sharing, while the profile is open
+WINDOWS_LOCK_FILE = 'lockfile'
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # e.g. PermissionError: the process exists but belongs to another user
+        return True
+    return True
+
+
+def profile_in_use(path):
+    """
+    True if a running Chrome holds the profile. A lock left behind by a
+    crashed Chrome on this host (its pid is gone) is removed so the profile
+    can be reused.
+    """
+    windows_lock = os.path.join(path, WINDOWS_LOCK_FILE)
+    if os.path.exists(windows_lock):
+        if os.name != 'nt':
+            return True
+        # Deleting fails while Chrome has the file open; a crashed Chrome's lock just goes away
+        try:
+            os.remove(windows_lock)
+        except OSError:
+            return True
+        print(f"Removed stale Chrome lock from profile {os.path.basename(path)}")
+
+    lock = os.path.join(path, 'SingletonLock')
+    try:
+        target = os.readlink(lock)
+    except FileNotFoundError:
+        return False
+    except OSError:
+        # Not a symlink (or no symlink support): nothing to check, assume it is held
+        return os.path.lexists(lock)
+
+    host, _, pid = target.rpartition('-')
+    if host != socket.gethostname() or not pid.isdigit() or _pid_alive(int(pid)):
+        return True
+    for filename in SINGLETON_FILES:
+        try:
+            os.remove(os.path.join(path, filename))
+        except OSError:
+            pass
+    print(f"Removed stale Chrome lock from profile {os.path.basename(path)} (pid {pid} is gone)")
+    return False
+
+
+def _dir_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, filename)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class ProfileStore:
+    """
+    Persistent Chrome profiles (user-data-dir plus disk cache) kept between runs.
+
+    Every concurrently running driver needs its own profile because Chrome
+    locks a user-data-dir while it is open, so profiles are named per scraper
+    and per worker. The whole store is capped at max_size_mb: when it grows
+    past the cap the least recently used profiles that are not in use are
+    deleted.
+    """
+
+    def __init__(self, root=DEFAULT_PROFILE_ROOT, max_size_mb=2048, cache_size_mb=256):
+        self.root = root
+        self.max_size = max_size_mb * 1024 * 1024
+        self.cache_size = cache_size_mb * 1024 * 1024
+        os.makedirs(self.root, exist_ok=True)
+
+    def profile_dir(self, name, worker=None):
+        """
+        Return (and create) the profile directory for a scraper/worker pair.
+
+        If that profile is already open in another Chrome (for example a second
+        process running the same scraper), a numbered sibling is used instead.
+        Locks left by a crashed Chrome do not count.
+        """
+        dirname = f"{name}-{worker}" if worker is not None else name
+        path = os.path.join(self.root, dirname)
+        copy = 1
+        while profile_in_use(path):
+            copy += 1
+            path = os.path.join(self.root, f"{dirname}-{copy}")
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, LAST_USED_MARKER), 'w'):
+            pass
+        return path
+
+    def apply(self, options, name, worker=None):
+        """Point Chrome options at the persistent profile and disk cache for name/worker."""
+        path = self.profile_dir(name, worker)
+        options.add_argument(f"--user-data-dir={path}")
+        options.add_argument(f"--disk-cache-dir={os.path.join(path, 'DiskCache')}")
+        options.add_argument(f"--disk-cache-size={self.cache_size}")
+        return path
+
+    def cleanup(self):
+        """Delete least recently used profiles until the store is under its size cap."""
+        total = 0
+        profiles = []
+        for entry in os.scandir(self.root):
+            if not entry.is_dir():
+                continue
+            size = _dir_size(entry.path)
+            total += size
+            if profile_in_use(entry.path):
+                continue
+            try:
+                last_used = os.path.getmtime(os.path.join(entry.path, LAST_USED_MARKER))
+            except OSError:
+                last_used = 0
+            profiles.append((last_used, entry.path, size))
+
+        removed = 0
+        for last_used, path, size in sorted(profiles):
+            if total <= self.max_size:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed += 1
+            print(f"Removed browser profile {os.path.basename(path)} (last used {time.ctime(last_used)})")
+        return removed
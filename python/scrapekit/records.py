@@ -0,0 +1,143 @@
+"""
+Compact lead records and columnar export.
+
+Lead is a __slots__ record shared by all scrapers; it costs a fraction of the
+memory of the equivalent dict, and repeated values such as the industry,
+location and source are interned so large merges hold one copy of each.
+LeadBatchWriter streams leads to Parquet or Arrow IPC files in record
+batches, so exports never need the whole run in a DataFrame.
+"""
+import sys
+
+FIELDS = (
+    'title', 'url', 'email', 'phone', 'address', 'contact_page', 'website',
+    'rating', 'reviews', 'category', 'source', 'industry', 'location',
+    'search_terms', 'place_id',
+)
+
+# Low-cardinality fields worth interning
+INTERNED_FIELDS = ('source', 'industry', 'location', 'category')
+
+
+class Lead:
+    """One business lead. Unset fields are None; search_terms is a list."""
+
+    __slots__ = FIELDS
+
+    def __init__(self, **fields):
+        for name in FIELDS:
+            value = fields.pop(name, None)
+            if name in INTERNED_FIELDS and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(self, name, value)
+        if self.search_terms is None:
+            self.search_terms = []
+        if fields:
+            raise TypeError(f"Unknown lead fields: {', '.join(fields)}")
+
+    def __repr__(self):
+        return f"Lead(title={self.title!r}, url={self.url!r})"
+
+    def has_contact(self):
+        return bool(self.email or self.phone)
+
+    def to_dict(self, columns=FIELDS):
+        return {name: getattr(self, name) for name in columns}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data.get(name) for name in FIELDS})
+
+
+def normalize_phone(phone):
+    """Digits of the last 10 places of a phone number, or None if too short."""
+    if not phone:
+        return None
+    digits = ''.join(ch for ch in str(phone) if ch.isdigit())
+    return digits[-10:] if len(digits) >= 7 else None
+
+
+def normalize_email(email):
+    if not email or '@' not in str(email):
+        return None
+    return str(email).strip().lower()
+
+
+def leads_to_rows(leads, columns):
+    """Dicts for CSV output; search_terms is joined into one cell."""
+    for lead in leads:
+        row = lead.to_dict(columns)
+        if 'search_terms' in row:
+            row['search_terms'] = '; '.join(row['search_terms'] or [])
+        yield row
+
+
+class LeadBatchWriter:
+    """
+    Write leads to a Parquet (.parquet) or Arrow IPC (.arrow/.feather) file
+    in record batches of batch_size. Requires pyarrow.
+
+        with LeadBatchWriter('leads.parquet') as writer:
+            for lead in leads:
+                writer.write(lead)
+    """
+
+    def __init__(self, path, columns=FIELDS, batch_size=5000):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("Parquet/Arrow export requires pyarrow: pip install pyarrow")
+
+        self.pa = pa
+        self.path = path
+        self.columns = list(columns)
+        self.batch_size = batch_size
+        self.buffer = []
+        self.written = 0
+        self.schema = pa.schema([
+            (name, pa.list_(pa.string()) if name == 'search_terms' else pa.string())
+            for name in self.columns
+        ])
+
+        if path.endswith('.parquet'):
+            import pyarrow.parquet as pq
+            self.writer = pq.ParquetWriter(path, self.schema, compression='zstd')
+        else:
+            self.sink = pa.OSFile(path, 'wb')
+            self.writer = pa.ipc.new_file(self.sink, self.schema)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, lead):
+        self.buffer.append(lead)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def write_all(self, leads):
+        for lead in leads:
+            self.write(lead)
+
+    def flush(self):
+        if not self.buffer:
+            return
+        arrays = []
+        for name in self.columns:
+            if name == 'search_terms':
+                values = [list(getattr(lead, name) or []) for lead in self.buffer]
+            else:
+                values = [None if getattr(lead, name) is None else str(getattr(lead, name))
+                          for lead in self.buffer]
+            arrays.append(self.pa.array(values, type=self.schema.field(name).type))
+        self.writer.write_batch(self.pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        self.written += len(self.buffer)
+        self.buffer = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+        if hasattr(self, 'sink'):
+            self.sink.close()
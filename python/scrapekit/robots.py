@@ -0,0 +1,199 @@
+"""
+Cached robots.txt and sitemap discovery.
+
+RobotsStore fetches robots.txt and the sitemap once per site and keeps the
+result on disk for `ttl` seconds. A server error or timeout on robots.txt
+disallows the whole site, but only for `error_ttl` seconds. It answers three questions for the
+scrapers: may this URL be fetched, how long to wait between requests to the
+site (Crawl-delay), and which contact/about pages the sitemap lists, so
+contact pages can be picked without guessing from homepage links.
+"""
+import json
+import os
+import random
+import re
+import threading
+import time
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'scrapekit', 'robots.json')
+
+LOC_PATTERN = re.compile(r'<loc>\s*(.*?)\s*</loc>', re.I | re.S)
+CONTACT_PATH_PATTERN = re.compile(r'contact|kontakt|impressum|imprint|about', re.I)
+
+# Sitemap indexes can list hundreds of children; pages are usually in the first few
+MAX_CHILD_SITEMAPS = 3
+MAX_SITEMAP_CONTACT_URLS = 10
+
+
+class SiteRules:
+    """robots.txt rules and sitemap contact pages for one origin."""
+
+    def __init__(self, origin, robots_txt='', status=404, contact_urls=None, fetched_at=None):
+        self.origin = origin
+        self.robots_txt = robots_txt
+        self.status = status
+        self.contact_urls = contact_urls or []
+        self.fetched_at = fetched_at or time.time()
+
+        self.parser = RobotFileParser()
+        # 5xx (and 599 for a failed request) may hide real rules: stay off the site for now
+        if status in (401, 403) or status >= 500:
+            self.parser.disallow_all = True
+        elif status >= 400:
+            self.parser.allow_all = True
+        else:
+            self.parser.parse(robots_txt.splitlines())
+
+    def to_dict(self):
+        return {
+            'robots_txt': self.robots_txt,
+            'status': self.status,
+            'contact_urls': self.contact_urls,
+            'fetched_at': self.fetched_at,
+        }
+
+    def can_fetch(self, url, user_agent='*'):
+        return self.parser.can_fetch(user_agent, url)
+
+    def crawl_delay(self, user_agent='*'):
+        return float(self.parser.crawl_delay(user_agent) or 0)
+
+    def sitemaps(self):
+        return self.parser.site_maps() or [f"{self.origin}/sitemap.xml"]
+
+
+def origin_of(url):
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc.lower()}"
+
+
+class RobotsStore:
+    """Thread-safe, disk-backed cache of SiteRules keyed by origin."""
+
+    def __init__(self, session, cache_path=DEFAULT_CACHE_PATH, ttl=24 * 60 * 60,
+                 user_agent='*', timeout=10, error_ttl=10 * 60):
+        self.session = session
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.sites = {}
+        self.lock = threading.Lock()
+        self.origin_locks = {}
+        self.dirty = False
+        self.load()
+
+    def _fresh(self, rules):
+        ttl = self.error_ttl if rules.status >= 500 else self.ttl
+        return time.time() - rules.fetched_at < ttl
+
+    def load(self):
+        if not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not read robots cache {self.cache_path}: {e}")
+            return
+        for origin, data in cached.items():
+            rules = SiteRules(origin, **data)
+            if self._fresh(rules):
+                self.sites[origin] = rules
+
+    def save(self):
+        """Write the cache to disk if anything was fetched since the last save."""
+        with self.lock:
+            if not self.dirty:
+                return
+            data = {origin: rules.to_dict() for origin, rules in self.sites.items()}
+            self.dirty = False
+        os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def _get_text(self, url):
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            return response.status_code, response.text
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+            return 599, ''
+
+    def _sitemap_contact_urls(self, rules, spacing=None):
+        """Collect contact/about page URLs from the site's sitemap(s), pausing `spacing` seconds (or the Crawl-delay) between fetches."""
+        found = []
+        queue = list(rules.sitemaps())
+        fetched = 0
+        while queue and fetched <= MAX_CHILD_SITEMAPS and len(found) < MAX_SITEMAP_CONTACT_URLS:
+            sitemap_url = queue.pop(0)
+            if not rules.can_fetch(sitemap_url, self.user_agent):
+                continue
+            delay = max(random.uniform(*spacing) if spacing else 0, rules.crawl_delay(self.user_agent))
+            if delay:
+                time.sleep(delay)
+            status, text = self._get_text(sitemap_url)
+            fetched += 1
+            if status != 200:
+                continue
+            locs = LOC_PATTERN.findall(text)
+            if '<sitemapindex' in text[:1000].lower():
+                # Prefer child sitemaps that look like page listings
+                children = sorted(locs, key=lambda loc: 'page' not in loc.lower())
+                queue.extend(children[:MAX_CHILD_SITEMAPS])
+                continue
+            for loc in locs:
+                if CONTACT_PATH_PATTERN.search(urlparse(loc).path) and loc not in found:
+                    found.append(loc)
+        return found[:MAX_SITEMAP_CONTACT_URLS]
+
+    def is_cached(self, url):
+        """True if the URL's origin has fresh rules, i.e. get() will not make any request."""
+        with self.lock:
+            rules = self.sites.get(origin_of(url))
+        return bool(rules) and self._fresh(rules)
+
+    def get(self, url, spacing=None):
+        """
+        Return SiteRules for the URL's origin, fetching robots.txt and sitemap
+        if needed. With spacing=(min, max), each sitemap request waits a
+        random gap in that range (or the Crawl-delay) after the previous one.
+        """
+        origin = origin_of(url)
+        with self.lock:
+            rules = self.sites.get(origin)
+            if rules and self._fresh(rules):
+                return rules
+            origin_lock = self.origin_locks.setdefault(origin, threading.Lock())
+
+        # One fetch per origin even when several workers ask at once
+        with origin_lock:
+            with self.lock:
+                rules = self.sites.get(origin)
+                if rules and self._fresh(rules):
+                    return rules
+
+            status, text = self._get_text(urljoin(origin, '/robots.txt'))
+            rules = SiteRules(origin, text if status == 200 else '', status)
+            rules.contact_urls = self._sitemap_contact_urls(rules, spacing)
+
+            with self.lock:
+                self.sites[origin] = rules
+                self.dirty = True
+        return rules
+
+    def can_fetch(self, url):
+        return self.get(url).can_fetch(url, self.user_agent)
+
+    def crawl_delay(self, url):
+        return self.get(url).crawl_delay(self.user_agent)
+
+    def contact_urls(self, url):
+        """Allowed contact/about URLs listed in the site's sitemap."""
+        rules = self.get(url)
+        return [candidate for candidate in rules.contact_urls if rules.can_fetch(candidate, self.user_agent)]
@@ -0,0 +1,136 @@
+"""
+Contact details from structured data.
+
+Many business homepages describe themselves with schema.org JSON-LD
+(LocalBusiness, Organization, ...) or itemprop microdata. When present this
+is far more reliable than regexing the raw HTML, and usually makes the
+contact page fetch unnecessary.
+"""
+import json
+import re
+from html import unescape
+
+from scrapekit.extract import EMAIL_PATTERN, PHONE_PATTERN, parse_attrs
+
+JSON_LD_PATTERN = re.compile(
+    r'<script\b[^>]*type\s*=\s*["\']?application/ld\+json["\']?[^>]*>(.*?)</script\s*>',
+    re.I | re.S
+)
+
+# Opening tag carrying itemprop="email|telephone|address|streetAddress|...",
+# plus the text that follows it up to the next tag
+ITEMPROP_PATTERN = re.compile(
+    r'<(\w+)\b([^>]*\bitemprop\s*=\s*["\']?(?:email|telephone|streetAddress|addressLocality|'
+    r'addressRegion|postalCode|addressCountry)\b[^>]*)>([^<]*)',
+    re.I
+)
+
+ADDRESS_PARTS = ['streetAddress', 'addressLocality', 'addressRegion', 'postalCode', 'addressCountry']
+
+
+def _strings(value):
+    """schema.org allows a list wherever a single value is expected."""
+    values = value if isinstance(value, list) else [value]
+    return [item.strip() for item in values if isinstance(item, str)]
+
+
+def _clean_email(value):
+    """First value that is a valid email address, or None."""
+    for item in _strings(value):
+        if item.lower().startswith('mailto:'):
+            item = item[7:]
+        item = item.split('?')[0].strip()
+        if EMAIL_PATTERN.fullmatch(item):
+            return item
+    return None
+
+
+def _clean_phone(value):
+    """First value that looks like a phone number, or None."""
+    for item in _strings(value):
+        if item.lower().startswith('tel:'):
+            item = item[4:].strip()
+        if PHONE_PATTERN.search(item):
+            return item
+    return None
+
+
+def _format_address(address):
+    if isinstance(address, str):
+        return ' '.join(address.split()) or None
+    if isinstance(address, dict):
+        parts = []
+        for key in ADDRESS_PARTS:
+            value = address.get(key)
+            if isinstance(value, dict):
+                value = value.get('name')
+            if value:
+                parts.append(str(value).strip())
+        return ', '.join(parts) or None
+    if isinstance(address, list) and address:
+        return _format_address(address[0])
+    return None
+
+
+def _walk(node):
+    """Yield every dict in a JSON-LD document, including @graph members and nested values."""
+    if isinstance(node, list):
+        for item in node:
+            yield from _walk(item)
+    elif isinstance(node, dict):
+        yield node
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                yield from _walk(value)
+
+
+def _from_json_ld(html):
+    result = {'email': None, 'phone': None, 'address': None}
+    for block in JSON_LD_PATTERN.findall(html):
+        try:
+            document = json.loads(unescape(block.strip()))
+        except ValueError:
+            continue
+        for node in _walk(document):
+            if node.get('email') and not result['email']:
+                result['email'] = _clean_email(node['email'])
+            if node.get('telephone') and not result['phone']:
+                result['phone'] = _clean_phone(node['telephone'])
+            if node.get('address') and not result['address']:
+                result['address'] = _format_address(node['address'])
+    return result
+
+
+def _from_microdata(html):
+    result = {'email': None, 'phone': None, 'address': None}
+    address_parts = {}
+    for tag, attr_string, text in ITEMPROP_PATTERN.findall(html):
+        attrs = parse_attrs(attr_string)
+        prop = attrs.get('itemprop', '')
+        value = attrs.get('content') or attrs.get('href') or unescape(text).strip()
+        if not value:
+            continue
+        if prop.lower() == 'email' and not result['email']:
+            result['email'] = _clean_email(value)
+        elif prop.lower() == 'telephone' and not result['phone']:
+            result['phone'] = _clean_phone(value)
+        elif prop in ADDRESS_PARTS:
+            address_parts.setdefault(prop, value)
+    if address_parts:
+        result['address'] = _format_address(address_parts)
+    return result
+
+
+def extract_structured_contact(html):
+    """
+    Return {'email', 'phone', 'address', 'confident'} from JSON-LD and
+    microdata. JSON-LD wins where both are present; `confident` means both an
+    email and a phone number were declared.
+    """
+    result = _from_json_ld(html) if 'ld+json' in html else {'email': None, 'phone': None, 'address': None}
+    if 'itemprop' in html and not all(result.values()):
+        microdata = _from_microdata(html)
+        for key, value in microdata.items():
+            result[key] = result[key] or value
+    result['confident'] = bool(result['email'] and result['phone'])
+    return result
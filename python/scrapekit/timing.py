@@ -0,0 +1,111 @@
+"""
+Stage timing for scraper runs.
+
+Wrap each stage of a run in a span:
+
+    timer = StageTimer()
+    with timer.span('page_load', url=url):
+        driver.get(url)
+
+report() summarises every stage (count, total, p50, p95) and the run's
+throughput; export_trace() writes the spans as a Chrome trace
+(chrome://tracing or https://ui.perfetto.dev) with one row per thread, so
+overlapping work such as background website lookups shows up as such.
+Timestamps are wall-clock based, so traces written by several worker
+processes can be combined with merge_traces().
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class StageTimer:
+    """Thread-safe collector of (stage, start, duration) spans."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.epoch = time.time()
+        self.spans = []
+
+    @contextmanager
+    def span(self, stage, **args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            thread = threading.current_thread()
+            with self.lock:
+                self.spans.append((stage, start, end - start, thread.ident, thread.name, args))
+
+    def stages(self):
+        """{stage: sorted durations in seconds}, in order of first appearance."""
+        durations = {}
+        with self.lock:
+            spans = list(self.spans)
+        for stage, _, duration, _, _, _ in spans:
+            durations.setdefault(stage, []).append(duration)
+        for values in durations.values():
+            values.sort()
+        return durations
+
+    def report(self, items=None, item_name='items'):
+        """Text table of per-stage timings, plus items per minute for the whole run."""
+        elapsed = time.perf_counter() - self.started
+        lines = [f"{'stage':<18}{'count':>7}{'total s':>10}{'p50 s':>9}{'p95 s':>9}"]
+        for stage, values in self.stages().items():
+            lines.append(
+                f"{stage:<18}{len(values):>7}{sum(values):>10.1f}"
+                f"{_percentile(values, 0.5):>9.2f}{_percentile(values, 0.95):>9.2f}"
+            )
+        summary = f"Run time {elapsed:.1f}s"
+        if items is not None and elapsed > 0:
+            summary += f", {items} {item_name} ({items / elapsed * 60:.1f}/min)"
+        lines.append(summary)
+        return '\n'.join(lines)
+
+    def export_trace(self, path):
+        """Write the spans as Chrome trace JSON and return the number of events."""
+        pid = os.getpid()
+        with self.lock:
+            spans = list(self.spans)
+        thread_ids = {}
+        events = []
+        for stage, start, duration, thread, thread_name, args in spans:
+            if thread not in thread_ids:
+                thread_ids[thread] = len(thread_ids) + 1
+                events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': thread_ids[thread],
+                               'args': {'name': thread_name}})
+            events.append({
+                'name': stage,
+                'ph': 'X',
+                'ts': round((self.epoch + start - self.started) * 1e6),
+                'dur': round(duration * 1e6),
+                'pid': pid,
+                'tid': thread_ids[thread],
+                'args': {key: str(value) for key, value in args.items()},
+            })
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return len(events)
+
+
+def merge_traces(paths, path):
+    """Combine the trace files of several processes into one; returns the number of events."""
+    events = []
+    for trace_path in paths:
+        with open(trace_path, 'r', encoding='utf-8') as f:
+            events.extend(json.load(f)['traceEvents'])
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+    return len(events)
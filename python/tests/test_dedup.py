@@ -0,0 +1,34 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from scrapekit.dedup import find_clusters
+from scrapekit.records import Lead
+
+
+def test_lead_without_phone_does_not_chain_conflicting_phones():
+    leads = [
+        Lead(title='Joe Pizza', phone='(503) 111-1111'),
+        Lead(title='Joe Pizza'),
+        Lead(title='Joe Pizza', phone='(503) 222-2222'),
+    ]
+    clusters = sorted(sorted(cluster) for cluster in find_clusters(leads))
+    assert clusters in ([[0, 1], [2]], [[0], [1, 2]])
+
+
+def test_same_name_without_conflict_is_merged():
+    leads = [
+        Lead(title='Joe Pizza', phone='(503) 111-1111'),
+        Lead(title="Joe's Pizza LLC"),
+    ]
+    assert sorted(map(sorted, find_clusters(leads, threshold=0.8))) == [[0, 1]]
+
+
+def test_chain_branches_sharing_a_website_stay_separate():
+    leads = [
+        Lead(title='Starbucks', website='https://www.starbucks.com/', place_id='P1'),
+        Lead(title='Starbucks', website='https://www.starbucks.com/', place_id='P2'),
+        Lead(title='Starbucks Coffee', website='https://starbucks.com/store-locator'),
+    ]
+    clusters = sorted(sorted(cluster) for cluster in find_clusters(leads))
+    assert clusters in ([[0, 2], [1]], [[0], [1, 2]])